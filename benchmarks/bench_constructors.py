@@ -0,0 +1,62 @@
+'''
+Construction time of every public rule constructor.
+'''
+from cubit import golub_welsch
+from benchmarks.common import constructors, prepare
+
+sized, fixed = constructors()
+double = {name: func for name, func in sized.items()
+          if not name.startswith('golub_welsch.')}
+multiple = {name: func for name, func in sized.items()
+            if name.startswith('golub_welsch.')}
+
+class SizedConstructors:
+    '''
+    Constructors taking a number of points or subintervals. The first size
+    parameter of a constructor is set to n, and the others are held fixed
+    (see `common.arguments`).
+    '''
+    params = (sorted(double), [4, 16, 64, 256, 1024])
+    param_names = ['constructor', 'n']
+    
+    def setup(self, name, n):
+        self.func = double[name]
+        self.args = prepare(self.func, n)
+    
+    def time_construct(self, name, n):
+        self.func(*self.args)
+
+class FixedConstructors:
+    '''
+    Tabulated rules with a fixed number of points.
+    '''
+    params = sorted(fixed)
+    param_names = ['constructor']
+    
+    def setup(self, name):
+        self.func = fixed[name]
+        self.args = prepare(self.func)
+    
+    def time_construct(self, name):
+        self.func(*self.args)
+
+class MultiplePrecision:
+    '''
+    Multiple-precision Gauss rules from `golub_welsch`, at the default
+    precision and with the on-disk cache disabled.
+    '''
+    params = (sorted(multiple), [4, 16, 64])
+    param_names = ['constructor', 'n']
+    timeout = 300
+    
+    def setup(self, name, n):
+        self.cache_dir = golub_welsch.cache_dir
+        golub_welsch.set_cache_dir(None)
+        self.func = multiple[name]
+        self.args = prepare(self.func, n)
+    
+    def teardown(self, name, n):
+        golub_welsch.set_cache_dir(self.cache_dir)
+    
+    def time_construct(self, name, n):
+        self.func(*self.args)
@@ -0,0 +1,76 @@
+'''
+Integration throughput and peak memory for large composite and
+product rules.
+'''
+import time
+import numpy as np
+from cubit import interval, square, tensor
+from cubit.integrate import integrate
+
+def integrand(x, y=0):
+    return np.exp(-x*x)*np.cos(3*y)
+
+class CompositeRule:
+    '''
+    Composite 8-point Gauss rules on [0, 1] with n nodes in total.
+    '''
+    params = [2**12, 2**16, 2**20, 2**22]
+    param_names = ['n']
+    
+    def setup(self, n):
+        self.rule = interval.composite_gauss(n//8, 8, 0, 1)
+    
+    def time_construct(self, n):
+        interval.composite_gauss(n//8, 8, 0, 1)
+    
+    def time_integrate(self, n):
+        integrate(integrand, self.rule)
+    
+    def track_nodes_per_second(self, n):
+        start = time.perf_counter()
+        integrate(integrand, self.rule)
+        return n/(time.perf_counter() - start)
+    track_nodes_per_second.unit = 'nodes/s'
+    
+    def peakmem_construct_and_integrate(self, n):
+        integrate(integrand, interval.composite_gauss(n//8, 8, 0, 1))
+
+class ProductRule:
+    '''
+    Product Gauss rules on the square with k points along each axis,
+    materialized, evaluated lazily in blocks, and evaluated on the
+    broadcast grid.
+    '''
+    params = [64, 256, 1024, 2048]
+    param_names = ['k']
+    
+    def setup(self, k):
+        self.rule = square.prod_gauss(k, k)
+        self.lazy = tensor.prod_gauss(k, k)
+    
+    def time_integrate(self, k):
+        integrate(integrand, self.rule)
+    
+    def time_integrate_blocks(self, k):
+        self.lazy.integrate(integrand)
+    
+    def time_integrate_grid(self, k):
+        self.lazy.integrate_grid(integrand)
+    
+    def track_nodes_per_second(self, k):
+        start = time.perf_counter()
+        integrate(integrand, self.rule)
+        return k*k/(time.perf_counter() - start)
+    track_nodes_per_second.unit = 'nodes/s'
+    
+    def track_nodes_per_second_blocks(self, k):
+        start = time.perf_counter()
+        self.lazy.integrate(integrand)
+        return k*k/(time.perf_counter() - start)
+    track_nodes_per_second_blocks.unit = 'nodes/s'
+    
+    def peakmem_materialized(self, k):
+        integrate(integrand, square.prod_gauss(k, k))
+    
+    def peakmem_blocks(self, k):
+        tensor.prod_gauss(k, k).integrate(integrand)
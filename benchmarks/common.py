@@ -0,0 +1,99 @@
+'''
+Helpers for finding the rule constructors to benchmark.
+'''
+import inspect
+import importlib
+import numpy as np
+
+modules = ['interval', 'line', 'ray', 'plane', 'square', 'disk', 'triangle',
+           'golub_welsch']
+
+# Public functions that are not rule constructors.
+excluded = {'affine', 'areas', 'from_barycentric', 'set_cache_dir', 'persistent'}
+
+# Arguments used for required parameters other than the size. Only the
+# first size parameter of a constructor is varied; the others (for example
+# m2 of a product rule) are held at `other_size`, and parameters giving the
+# order of the underlying rule (the number of points in each subinterval
+# of a Newton-Cotes or composite Gauss rule) at `order`.
+size_names = {'n', 'm', 'n1', 'n2', 'm1', 'm2'}
+order_names = {
+    'newton_cotes': {'n'},
+    'composite_gauss': {'n'},
+    'prod_newton_cotes': {'n1', 'n2'},
+}
+other_size = 4
+order = 5
+fixed_args = {
+    'alpha': 0.5,
+    'beta': 1.5,
+    'vertices': np.array([[0, 0], [1, 0], [0, 1]], dtype=float),
+}
+
+def required(func):
+    return [p.name for p in inspect.signature(func).parameters.values()
+            if p.default is p.empty
+            and p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]
+
+def constructors(module_names=modules):
+    '''
+    Find the public rule constructors in the given cubit modules.
+    
+    Returns two dictionaries mapping 'module.function' to the function:
+    one of the constructors taking a size (n, m, ...) and one of those
+    with a fixed number of points. Modules that cannot be imported (for
+    example, golub_welsch without mpmath) and functions with parameters
+    that cannot be filled in automatically are left out.
+    '''
+    sized = {}
+    fixed = {}
+    for module_name in module_names:
+        try:
+            module = importlib.import_module(f'cubit.{module_name}')
+        except ImportError:
+            continue
+        for name, func in inspect.getmembers(module, inspect.isfunction):
+            if (name.startswith('_') or name in excluded
+                or getattr(func, '__module__', None) != module.__name__):
+                continue
+            params = required(func)
+            if not all(p in size_names or p in fixed_args for p in params):
+                continue
+            key = f'{module_name}.{name}'
+            if any(p in size_names for p in params):
+                sized[key] = func
+            else:
+                fixed[key] = func
+    return sized, fixed
+
+def arguments(func, size=None):
+    '''
+    The positional arguments with which to call a constructor.
+    '''
+    orders = order_names.get(func.__name__, set())
+    args = []
+    varied = False
+    for p in required(func):
+        if p in orders:
+            args.append(order)
+        elif p in size_names:
+            args.append(other_size if varied else size)
+            varied = True
+        else:
+            args.append(fixed_args[p])
+    return args
+
+def prepare(func, size=None):
+    '''
+    Return the arguments for `func`, after checking that the call works
+    and returns a rule. Raises NotImplementedError (which asv treats as
+    "skip this benchmark") otherwise.
+    '''
+    args = arguments(func, size)
+    try:
+        rule = func(*args)
+    except Exception as exc:
+        raise NotImplementedError(f'{func.__name__} failed: {exc!r}')
+    if rule is None:
+        raise NotImplementedError(f'{func.__name__} is not implemented')
+    return args
@@ -0,0 +1,257 @@
+'''
+Run the benchmarks in this directory and keep their results by commit.
+
+The benchmark classes follow the conventions of airspeed velocity (asv):
+`params` and `param_names` class attributes, `setup` and `teardown`
+methods (a NotImplementedError from `setup` skips that benchmark), and
+methods whose names begin with `time_`, `peakmem_` or `track_`. They can
+be run with asv, but this runner needs nothing beyond the standard
+library (and matplotlib for plots). Run it from the repository root:
+
+    python -m benchmarks.run run [-b PATTERN] [--quick]
+    python -m benchmarks.run compare OLD NEW [--factor 1.2]
+    python -m benchmarks.run plot [-b PATTERN]
+
+`run` stores the results for the current commit in
+benchmarks/results/<commit>.json, or <commit>-dirty.json if the working
+tree has uncommitted changes; `compare` lists the benchmarks that got
+worse by more than `factor` between two stored results, named by their
+file names without .json (e.g. 1a2b3c4 and 1a2b3c4-dirty); and `plot` draws
+the stored results against the commits, in order of commit date, in
+benchmarks/results/plots.
+
+Time is the best per-call wall time of several repeats. Unlike asv,
+which records the peak resident size of the process, `peakmem_`
+benchmarks record the peak memory allocated through Python's
+allocators during the call (as traced by tracemalloc), which includes
+numpy arrays.
+'''
+import argparse
+import datetime
+import importlib
+import inspect
+import itertools
+import json
+import os
+import pkgutil
+import platform
+import re
+import subprocess
+import sys
+import timeit
+import tracemalloc
+import numpy as np
+
+directory = os.path.dirname(os.path.abspath(__file__))
+results_dir = os.path.join(directory, 'results')
+prefixes = ('time_', 'peakmem_', 'track_')
+
+def discover(pattern=None):
+    '''
+    Yield (name, class, method name) for every benchmark in the
+    bench_* modules whose name 'module.Class.method' matches `pattern`.
+    '''
+    for info in pkgutil.iter_modules([directory]):
+        if not info.name.startswith('bench_'):
+            continue
+        module = importlib.import_module(f'benchmarks.{info.name}')
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for method in sorted(vars(cls)):
+                name = f'{info.name}.{cls.__name__}.{method}'
+                if (method.startswith(prefixes)
+                    and (pattern is None or re.search(pattern, name))):
+                    yield name, cls, method
+
+def combinations(cls):
+    params = getattr(cls, 'params', [])
+    if not params:
+        return [()]
+    if len(getattr(cls, 'param_names', [])) <= 1:
+        return [(p,) for p in params]
+    return list(itertools.product(*params))
+
+def measure(func, kind, repeat):
+    if kind == 'time_':
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        return min(timer.repeat(repeat, number))/number
+    if kind == 'peakmem_':
+        tracemalloc.start()
+        try:
+            func()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return func()
+
+def run(pattern=None, quick=False):
+    '''
+    Run the benchmarks and return a dictionary of results, keyed by
+    benchmark name, with a list of {'params', 'value', 'unit'} entries.
+    Skipped or failing parameter combinations get a value of None.
+    '''
+    results = {}
+    for name, cls, method in discover(pattern):
+        kind = next(prefix for prefix in prefixes if method.startswith(prefix))
+        unit = {'time_': 'seconds', 'peakmem_': 'bytes'}.get(
+            kind, getattr(getattr(cls, method), 'unit', 'unit'))
+        entries = []
+        for params in combinations(cls):
+            instance = cls()
+            value = None
+            try:
+                if hasattr(instance, 'setup'):
+                    instance.setup(*params)
+                bound = getattr(instance, method)
+                value = measure(lambda: bound(*params), kind, 1 if quick else 5)
+            except NotImplementedError:
+                pass
+            except Exception as exc:
+                print(f'{name}{list(params)} failed: {exc!r}', file=sys.stderr)
+            finally:
+                if hasattr(instance, 'teardown'):
+                    instance.teardown(*params)
+            entries.append({'params': [str(p) for p in params],
+                            'value': value, 'unit': unit})
+            print(f'{name}{list(params)}: {value}')
+        results[name] = entries
+    return results
+
+def git(*args):
+    try:
+        return subprocess.run(('git',) + args, cwd=directory, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def save(results):
+    '''
+    Store results along with the commit, its date and the environment,
+    merging them into any results already stored for the same commit.
+    Returns the path of the file written.
+    '''
+    commit = git('rev-parse', '--short', 'HEAD') or 'unknown'
+    dirty = bool(git('status', '--porcelain', '--untracked-files=no'))
+    path = os.path.join(results_dir, f'{commit}{"-dirty" if dirty else ""}.json')
+    if os.path.exists(path):
+        with open(path) as f:
+            results = dict(json.load(f)['results'], **results)
+    record = {
+        'commit': commit,
+        'dirty': dirty,
+        'date': git('show', '-s', '--format=%cI', 'HEAD')
+                or datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.node(),
+        'results': results,
+    }
+    os.makedirs(results_dir, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(record, f, indent=1)
+    return path
+
+def load():
+    '''
+    Load all stored results, in order of commit date. Each record gets a
+    'name', the name of its file without .json, which distinguishes the
+    results for a commit from those for uncommitted changes on top of it.
+    '''
+    records = []
+    for filename in os.listdir(results_dir):
+        if filename.endswith('.json'):
+            with open(os.path.join(results_dir, filename)) as f:
+                record = json.load(f)
+            record['name'] = filename[:-len('.json')]
+            records.append(record)
+    return sorted(records, key=lambda record: record['date'])
+
+def values(record):
+    return {(name, tuple(entry['params'])): (entry['value'], entry['unit'])
+            for name, entries in record['results'].items()
+            for entry in entries if entry['value'] is not None}
+
+def compare(old, new, factor=1.2):
+    '''
+    Return (name, params, old value, new value) for the benchmarks that
+    got worse by more than `factor` between two stored results, named as
+    in `load`: slower, more memory, or (for `track_` throughputs in units
+    per second) lower.
+    '''
+    records = {record['name']: record for record in load()}
+    before, after = values(records[old]), values(records[new])
+    worse = []
+    for key in sorted(before.keys() & after.keys()):
+        (a, unit), (b, _) = before[key], after[key]
+        if a and b and (a/b if unit.endswith('/s') else b/a) > factor:
+            worse.append(key + (a, b))
+    return worse
+
+def plot(pattern=None):
+    '''
+    Plot each benchmark against the stored commits, with one line for each
+    value of the last parameter and one figure for each combination of
+    the others. Returns the paths of the files written.
+    '''
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    records = load()
+    labels = [record['name'] for record in records]
+    series = {}
+    for i, record in enumerate(records):
+        for (name, params), (value, unit) in values(record).items():
+            if pattern is None or re.search(pattern, name):
+                figure = (name, params[:-1], unit)
+                line = params[-1] if params else ''
+                series.setdefault(figure, {}).setdefault(line, []).append((i, value))
+    out = os.path.join(results_dir, 'plots')
+    os.makedirs(out, exist_ok=True)
+    paths = []
+    for (name, group, unit), lines in sorted(series.items()):
+        fig, ax = plt.subplots(figsize=(8, 4.5))
+        for line, points in lines.items():
+            x, y = zip(*points)
+            ax.plot(x, y, marker='o', label=line)
+        ax.set_xticks(range(len(labels)))
+        ax.set_xticklabels(labels, rotation=45, ha='right')
+        ax.set_yscale('log')
+        ax.set_ylabel(unit)
+        ax.set_title(' '.join((name,) + group))
+        if any(lines):
+            ax.legend(fontsize='x-small', ncol=1 + len(lines)//20,
+                      loc='upper left', bbox_to_anchor=(1, 1))
+        filename = re.sub(r'[^\w.-]+', '_', '-'.join((name,) + group)) + '.png'
+        path = os.path.join(out, filename)
+        fig.savefig(path, bbox_inches='tight')
+        plt.close(fig)
+        paths.append(path)
+    return paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run cubit benchmarks.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run')
+    run_parser.add_argument('-b', '--bench', help='regular expression for benchmark names')
+    run_parser.add_argument('--quick', action='store_true', help='time each benchmark only once')
+    compare_parser = commands.add_parser('compare')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--factor', type=float, default=1.2)
+    plot_parser = commands.add_parser('plot')
+    plot_parser.add_argument('-b', '--bench', help='regular expression for benchmark names')
+    args = parser.parse_args(argv)
+    
+    if args.command == 'run':
+        print('Results written to', save(run(args.bench, args.quick)))
+    elif args.command == 'compare':
+        for name, params, old, new in compare(args.old, args.new, args.factor):
+            print(f'{name}{list(params)}: {old:.4g} -> {new:.4g}')
+    else:
+        for path in plot(args.bench):
+            print(path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+import heapq
+import numpy as np
+from cubit import interval, triangle
+from cubit.integrate import unpack
+
+def gauss_kronrod(f, lower=-1, upper=1, atol=1e-10, rtol=1e-10,
+                  batch=16, max_eval=10**6):
+    '''
+    Globally adaptive Gauss-Kronrod integration on [lower, upper]:
+
+    Subintervals are kept in a priority heap keyed by their error estimate,
+    the difference between the 15-point Kronrod and 7-point Gauss estimates.
+    On each iteration, up to `batch` of the worst subintervals are bisected
+    and all of the new halves are evaluated with a single call of `f` on
+    a one-dimensional array of nodes.
+    Stops when the total error estimate is below max(atol, rtol*|value|)
+    or the number of integrand evaluations would exceed `max_eval`.
+
+    Returns a tuple of the integral estimate, the error estimate, and
+    the number of integrand evaluations.
+    '''
+    nodes, kronrod_weights, gauss_weights = interval.gauss_kronrod()
+    npts = len(nodes)
+
+    def estimate(lowers, uppers):
+        x, wk = interval.affine(nodes, kronrod_weights, lowers, uppers)
+        wg = interval.affine(nodes, gauss_weights, lowers, uppers)[1]
+        values = np.asarray(f(x.ravel())).reshape(x.shape)
+        kronrod = np.sum(values*wk, axis=-1)
+        return kronrod, np.abs(kronrod - np.sum(values*wg, axis=-1))
+
+    value, error = estimate(np.array([lower]), np.array([upper]))
+    heap = [(-error[0], lower, upper, value[0])]
+    neval = npts
+    total, total_error = value[0], error[0]
+    while total_error > max(atol, rtol*abs(total)):
+        count = min(batch, len(heap), (max_eval - neval)//(2*npts))
+        if count == 0:
+            break
+        worst = [heapq.heappop(heap) for _ in range(count)]
+        a = np.array([item[1] for item in worst])
+        b = np.array([item[2] for item in worst])
+        mid = (a + b)/2
+        values, errors = estimate(np.concatenate((a, mid)),
+                                  np.concatenate((mid, b)))
+        neval += 2*count*npts
+        for lo, hi, value, error in zip(np.concatenate((a, mid)),
+                                        np.concatenate((mid, b)),
+                                        values, errors):
+            heapq.heappush(heap, (-error, lo, hi, value))
+        # Re-sum rather than update, so rounding errors do not accumulate.
+        total = sum(item[3] for item in heap)
+        total_error = -sum(item[0] for item in heap)
+    return total, total_error, neval
+
+def genz_malik_rule(d):
+    '''
+    Genz-Malik rule (degree 7) with its embedded degree-5 rule on [-1, 1]**d.
+    Uses 2**d + 2*d**2 + 2*d + 1 points.
+
+    Returns a tuple of an N×d array of nodes, the degree-7 weights and the
+    degree-5 weights, both normalized to sum to 1.
+
+    Genz, A. C., and Malik, A. A., "An adaptive algorithm for numerical
+    integration over an N-dimensional rectangular region",
+    J. Comput. Appl. Math., v. 6, 1980, pp. 295-302.
+    '''
+    l2 = np.sqrt(9/70)
+    l3 = np.sqrt(9/10)
+    l4 = np.sqrt(9/10)
+    l5 = np.sqrt(9/19)
+    eye = np.eye(d)
+    i, j = np.triu_indices(d, 1)
+    signs = np.array([[1, 1], [1, -1], [-1, 1], [-1, -1]])
+    pairs = np.zeros((4*len(i), d))
+    pairs[np.arange(4*len(i)), np.repeat(i, 4)] = l4*np.tile(signs[:,0], len(i))
+    pairs[np.arange(4*len(i)), np.repeat(j, 4)] = l4*np.tile(signs[:,1], len(i))
+    corners = l5*(1 - 2*((np.arange(2**d)[:,np.newaxis] >> np.arange(d)) & 1))
+    nodes = np.concatenate((np.zeros((1, d)), l2*eye, -l2*eye,
+                            l3*eye, -l3*eye, pairs, corners))
+    counts = [1, 2*d, 2*d, len(pairs), len(corners)]
+    weights = np.repeat([(12824 - 9120*d + 400*d**2)/19683, 980/6561,
+                         (1820 - 400*d)/19683, 200/19683, 6859/19683/2**d],
+                        counts)
+    embedded = np.repeat([(729 - 950*d + 50*d**2)/729, 245/486,
+                          (265 - 100*d)/1458, 25/729, 0], counts)
+    return nodes, weights, embedded
+
+def genz_malik(f, lower, upper, atol=1e-10, rtol=1e-10, rule=None,
+               batch=16, max_eval=10**6):
+    '''
+    Globally adaptive cubature over the box with corners `lower`, `upper`:
+
+    Subregions are kept in a priority heap keyed by their error estimate,
+    the difference between a rule and a lower-degree embedded rule. On each
+    iteration, up to `batch` of the worst subregions are bisected and all of
+    the new halves are evaluated with a single call `f(*nodes)`.
+
+    By default, the Genz-Malik degree 7/5 pair is used, and regions are split
+    along the axis with the largest fourth difference. Alternatively `rule`
+    may be a pair of rules on [-1, 1]**d, for instance `(square.rr_25pt(),
+    square.radon_7pt())` in two dimensions; regions are then split along
+    their longest side.
+
+    Returns a tuple of the integral estimate, the error estimate, and
+    the number of integrand evaluations.
+    '''
+    lower = np.atleast_1d(np.asarray(lower, dtype=float))
+    upper = np.atleast_1d(np.asarray(upper, dtype=float))
+    d = len(lower)
+    if rule is None:
+        nodes, weights, embedded = genz_malik_rule(d)
+        l2, l3 = np.sqrt(9/70), np.sqrt(9/10)
+    else:
+        nodes, weights, embedded = _embedded_pair(*rule)
+    npts = len(nodes)
+
+    def estimate(centers, halfwidths):
+        x = centers[:,np.newaxis,:] + halfwidths[:,np.newaxis,:]*nodes
+        values = np.asarray(f(*x.reshape(-1, d).T)).reshape(len(centers), npts)
+        volume = np.prod(2*halfwidths, axis=-1)
+        result = volume*(values @ weights)
+        error = volume*np.abs(values @ (weights - embedded))
+        if rule is None:
+            center = values[:, :1]
+            inner = values[:, 1:1+d] + values[:, 1+d:1+2*d] - 2*center
+            outer = values[:, 1+2*d:1+3*d] + values[:, 1+3*d:1+4*d] - 2*center
+            axis = np.argmax(np.abs(inner - (l2/l3)**2*outer), axis=-1)
+        else:
+            axis = np.argmax(halfwidths, axis=-1)
+        return result, error, axis
+
+    centers = ((lower + upper)/2)[np.newaxis]
+    halfwidths = ((upper - lower)/2)[np.newaxis]
+    result, error, axis = estimate(centers, halfwidths)
+    heap = [(-error[0], 0, centers[0], halfwidths[0], result[0], axis[0])]
+    neval = npts
+    counter = 1
+    total, total_error = result[0], error[0]
+    while total_error > max(atol, rtol*abs(total)):
+        count = min(batch, len(heap), (max_eval - neval)//(2*npts))
+        if count == 0:
+            break
+        worst = [heapq.heappop(heap) for _ in range(count)]
+        centers = np.array([item[2] for item in worst])
+        halfwidths = np.array([item[3] for item in worst])
+        split = np.array([item[5] for item in worst])
+        halfwidths[np.arange(count), split] /= 2
+        offsets = np.zeros_like(centers)
+        offsets[np.arange(count), split] = halfwidths[np.arange(count), split]
+        centers = np.concatenate((centers - offsets, centers + offsets))
+        halfwidths = np.concatenate((halfwidths, halfwidths))
+        result, error, axis = estimate(centers, halfwidths)
+        neval += 2*count*npts
+        for k in range(2*count):
+            heapq.heappush(heap, (-error[k], counter, centers[k], halfwidths[k],
+                                  result[k], axis[k]))
+            counter += 1
+        total = sum(item[4] for item in heap)
+        total_error = -sum(item[0] for item in heap)
+    return total, total_error, neval
+
+def _embedded_pair(rule, embedded):
+    '''
+    Combine a rule and an embedded rule, in any layout accepted by
+    `integrate.unpack`, into a common set of nodes with two weight vectors
+    normalized to sum to 1. Nodes shared by both rules are only used once.
+    '''
+    nodes1, weights1 = unpack(rule)
+    nodes2, weights2 = unpack(embedded)
+    nodes1 = np.stack(nodes1, axis=-1)
+    nodes2 = np.stack(nodes2, axis=-1)
+    nodes, inverse = np.unique(np.round(np.concatenate((nodes1, nodes2)), 14),
+                               axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    weights = np.zeros(len(nodes))
+    np.add.at(weights, inverse[:len(nodes1)], weights1/np.sum(weights1))
+    embedded_weights = np.zeros(len(nodes))
+    np.add.at(embedded_weights, inverse[len(nodes1):], weights2/np.sum(weights2))
+    return nodes, weights, embedded_weights
+
+def triangles(f, vertices, triangles=None, atol=1e-10, rtol=1e-10,
+              batch=16, max_eval=10**6):
+    '''
+    Globally adaptive cubature over a triangle or a triangulated region:
+
+    Each triangle is integrated with the Radon 7-point rule (degree 5),
+    and the difference from the Albrecht-Collatz 6-point rule (degree 3)
+    serves as its error estimate. Triangles are kept in a priority heap
+    keyed by their error estimate. On each iteration, up to `batch` of the
+    worst triangles are split 4-to-1 at their edge midpoints, and all of the
+    new triangles are evaluated with a single call `f(*nodes)`.
+
+    `vertices` may be a 3×d array for a single triangle, a T×3×d array,
+    or a V×d array of points together with a T×3 array `triangles`
+    of vertex indices (see `triangle.from_barycentric`).
+
+    Returns a tuple of the integral estimate, the error estimate, and
+    the number of integrand evaluations.
+    '''
+    vertices = np.asarray(vertices, dtype=float)
+    if triangles is not None:
+        vertices = vertices[triangles]
+    if vertices.ndim == 2:
+        vertices = vertices[np.newaxis]
+    d = vertices.shape[-1]
+
+    def estimate(vertices):
+        nodes7, weights7 = triangle.radon_7pt(vertices)
+        nodes6, weights6 = triangle.ac_6pt(vertices)
+        nodes = np.concatenate((nodes7, nodes6), axis=1)
+        values = np.asarray(f(*nodes.reshape(-1, d).T)).reshape(nodes.shape[:2])
+        result = np.sum(values[:, :7]*weights7, axis=-1)
+        error = np.abs(result - np.sum(values[:, 7:]*weights6, axis=-1))
+        return result, error, values.size
+
+    result, error, neval = estimate(vertices)
+    heap = [(-e, k, v, r) for k, (v, r, e) in enumerate(zip(vertices, result, error))]
+    heapq.heapify(heap)
+    counter = len(heap)
+    total, total_error = np.sum(result), np.sum(error)
+    npts = 4*13
+    while total_error > max(atol, rtol*abs(total)):
+        count = min(batch, len(heap), (max_eval - neval)//npts)
+        if count == 0:
+            break
+        worst = np.array([heapq.heappop(heap)[2] for _ in range(count)])
+        v0, v1, v2 = worst[:, 0], worst[:, 1], worst[:, 2]
+        m01, m12, m20 = (v0 + v1)/2, (v1 + v2)/2, (v2 + v0)/2
+        children = np.concatenate((np.stack((v0, m01, m20), axis=1),
+                                   np.stack((m01, v1, m12), axis=1),
+                                   np.stack((m20, m12, v2), axis=1),
+                                   np.stack((m01, m12, m20), axis=1)))
+        result, error, count = estimate(children)
+        neval += count
+        for v, r, e in zip(children, result, error):
+            heapq.heappush(heap, (-e, counter, v, r))
+            counter += 1
+        total = sum(item[3] for item in heap)
+        total_error = -sum(item[0] for item in heap)
+    return total, total_error, neval
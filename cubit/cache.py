@@ -0,0 +1,124 @@
+import inspect
+from collections import OrderedDict
+from functools import wraps
+import numpy as np
+
+class RuleCache:
+    '''
+    A size-bounded least-recently-used cache of quadrature rules.
+
+    Entries are keyed by the rule constructor, its arguments and the
+    requested dtype. Cached arrays are marked read-only, so the same
+    arrays can be handed out to every caller without copying. Callers
+    that need to modify a rule should copy it first.
+    '''
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, func, *args, dtype=np.float64, **kwargs):
+        '''
+        Return the rule `func(*args, **kwargs)` with arrays of the given
+        dtype, computing and storing it if it is not already cached.
+        '''
+        key = make_key(func, args, kwargs, dtype)
+        try:
+            rule = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            rule = freeze(func(*args, **kwargs), dtype)
+            self._entries[key] = rule
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return rule
+
+    def clear(self):
+        '''
+        Remove all entries and reset the hit/miss statistics.
+        '''
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        '''
+        Return a dictionary of hit/miss statistics and current size.
+        '''
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._entries), 'maxsize': self.maxsize}
+
+def make_key(func, args, kwargs, dtype):
+    '''
+    Build a hashable cache key for a rule constructor call. The call is
+    first bound to the signature of `func`, with defaults filled in, so
+    that f(5, 2), f(5, m=2) and (if m defaults to 2) f(5) share a key.
+    Array-valued arguments are keyed by their contents.
+    '''
+    name = (getattr(func, '__module__', None), getattr(func, '__qualname__', func))
+    try:
+        bound = inspect.signature(func).bind(*args, **kwargs)
+    except (TypeError, ValueError):
+        # No signature, or a call that func itself will reject
+        params = (_hashable(args), _hashable(kwargs))
+    else:
+        bound.apply_defaults()
+        params = _hashable(bound.arguments)
+    return name, params, np.dtype(dtype).str
+
+def _hashable(value):
+    if isinstance(value, np.ndarray):
+        return (value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def freeze(rule, dtype=np.float64):
+    '''
+    Convert every array in a (possibly nested) rule tuple to the given
+    dtype and mark it read-only.
+    '''
+    if isinstance(rule, (tuple, list)):
+        return tuple(freeze(part, dtype) for part in rule)
+    array = np.array(rule, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+registry = RuleCache()
+
+def cached_rule(func, *args, dtype=np.float64, **kwargs):
+    '''
+    Look up `func(*args, **kwargs)` in the shared registry.
+    For example, `cached_rule(interval.gauss_legendre, 20, 0, 1)`.
+    '''
+    return registry.get(func, *args, dtype=dtype, **kwargs)
+
+def memoize(func, cache=None):
+    '''
+    Wrap a rule constructor so that its results are served from
+    `cache` (the shared registry by default). The wrapper accepts an
+    additional `dtype` keyword argument.
+    '''
+    if cache is None:
+        cache = registry
+
+    @wraps(func)
+    def wrapper(*args, dtype=np.float64, **kwargs):
+        return cache.get(func, *args, dtype=dtype, **kwargs)
+
+    wrapper.cache = cache
+    return wrapper
@@ -1,8 +1,11 @@
 import numpy as np
 from numpy import pi, sin, cos, exp, log, sqrt
+from cubit import precision
 
 def sphprod_gauss(n):
+    raise NotImplementedError('disk.sphprod_gauss is not implemented')
 
+@precision.with_dtype
 def square1():
     '''
     Square rule (Stroud S2: 3-1):
@@ -16,6 +19,7 @@ def square1():
     
     return (x_nodes, y_nodes), pi*weights
 
+@precision.with_dtype
 def square2():
     '''
     Inscribed square rule (Stroud S2: 3-2):
@@ -31,6 +35,7 @@ def square2():
     
     return x_nodes, y_nodes, pi*weights
 
+@precision.with_dtype
 def pentagon(alpha = 0):
     '''
     Pentagonal rule (Stroud S2: 4-1):
@@ -51,6 +56,7 @@ def pentagon(alpha = 0):
     
     return x_nodes, y_nodes, V*weights
 
+@precision.with_dtype
 def hexagon(alpha = 0):
     '''
     Hexagonal rule (Stroud S2: 5-1):
@@ -72,6 +78,7 @@ def hexagon(alpha = 0):
     
     return x_nodes, y_nodes, V*weights
 
+@precision.with_dtype
 def grid_9pt():
     '''
     Nine-point grid rule (Stroud S2: 5-2):
@@ -88,6 +95,7 @@ def grid_9pt():
     
     return (x_nodes, y_nodes), pi*weights
 
+@precision.with_dtype
 def peirce_12pt():
     '''
     Peirce's twelve-point rule (Stroud S2: 7-1):
@@ -116,6 +124,7 @@ def peirce_12pt():
     
     return (x_nodes, y_nodes), pi*weights
 
+@precision.with_dtype
 def double_octagon():
     '''
     Double octagon rule (Stroud S2: 7-2):
@@ -137,6 +146,7 @@ def double_octagon():
     
     return (x_nodes, y_nodes), pi*weights
 
+@precision.with_dtype
 def albrecht_19pt():
     '''
     Albrecht's nineteen-point rule (Stroud S2: 9-1):
@@ -167,6 +177,7 @@ def albrecht_19pt():
     
     return (x_nodes, y_nodes), pi*weights
 
+@precision.with_dtype
 def rr_20pt():
     '''
     Rabinowitz-Richter 20-point rule (Stroud S2: 9-2):
@@ -195,6 +206,7 @@ def rr_20pt():
     
     return (x_nodes, y_nodes), pi*weights
 
+@precision.with_dtype
 def lyusternik_21pt():
     '''
     Lyusternik 21-point rule (Stroud S2: 9-3):
@@ -229,6 +241,7 @@ def lyusternik_21pt():
     
     return (x_nodes, y_nodes), pi*weights
 
+@precision.with_dtype
 def rr_21pt():
     '''
     Rabinowitz-Richter 21-point rule (Stroud S2: 9-5):
@@ -259,6 +272,7 @@ def rr_21pt():
     
     return (x_nodes, y_nodes), pi*weights
 
+@precision.with_dtype
 def peirce_28pt():
     '''
     Peirce's 28-point rule
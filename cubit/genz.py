@@ -0,0 +1,162 @@
+import time
+from math import factorial
+from itertools import product
+import numpy as np
+from numpy import pi, exp, sqrt
+from scipy import special
+from cubit.integrate import unpack, evaluate, contract
+
+# The six test families on [0, 1]**d. Each takes a list of d coordinate
+# arrays of shape (n,) and parameters a and u of shape (draws, d), and
+# returns values of shape (draws, n), so that all draws are evaluated in
+# one batch.
+
+def oscillatory(x, a, u):
+    return np.cos(2*pi*u[:,:1] + sum(a[:,i:i+1]*xi for i, xi in enumerate(x)))
+
+def product_peak(x, a, u):
+    return np.prod([1/(a[:,i:i+1]**-2 + (xi - u[:,i:i+1])**2)
+                    for i, xi in enumerate(x)], axis=0)
+
+def corner_peak(x, a, u):
+    return (1 + sum(a[:,i:i+1]*xi for i, xi in enumerate(x)))**-(len(x) + 1)
+
+def gaussian(x, a, u):
+    return exp(-sum(a[:,i:i+1]**2*(xi - u[:,i:i+1])**2 for i, xi in enumerate(x)))
+
+def continuous(x, a, u):
+    return exp(-sum(a[:,i:i+1]*np.abs(xi - u[:,i:i+1]) for i, xi in enumerate(x)))
+
+def discontinuous(x, a, u):
+    inside = np.all([xi <= u[:,i:i+1] for i, xi in enumerate(x[:2])], axis=0)
+    return np.where(inside, exp(sum(a[:,i:i+1]*xi for i, xi in enumerate(x))), 0)
+
+# The exact integrals over [0, 1]**d, one for each draw of the parameters.
+
+def _oscillatory_exact(a, u):
+    return np.real(exp(2j*pi*u[:,0])*np.prod((exp(1j*a) - 1)/(1j*a), axis=1))
+
+def _product_peak_exact(a, u):
+    return np.prod(a*(np.arctan(a*(1 - u)) + np.arctan(a*u)), axis=1)
+
+def _corner_peak_exact(a, u):
+    # Σ over the vertices v of the cube of (-1)**|v|/(1 + a·v), over d! Π a
+    d = a.shape[1]
+    vertices = np.array(list(product((0, 1), repeat=d)))
+    signs = (-1)**np.sum(vertices, axis=1)
+    return np.sum(signs/(1 + a @ vertices.T), axis=1)/(factorial(d)*np.prod(a, axis=1))
+
+def _gaussian_exact(a, u):
+    return np.prod(sqrt(pi)/(2*a)*(special.erf(a*(1 - u)) + special.erf(a*u)), axis=1)
+
+def _continuous_exact(a, u):
+    return np.prod((2 - exp(-a*u) - exp(-a*(1 - u)))/a, axis=1)
+
+def _discontinuous_exact(a, u):
+    upper = np.ones_like(u)
+    upper[:,:2] = u[:,:2]
+    return np.prod(np.expm1(a*upper)/a, axis=1)
+
+families = {
+    'oscillatory': (oscillatory, _oscillatory_exact),
+    'product_peak': (product_peak, _product_peak_exact),
+    'corner_peak': (corner_peak, _corner_peak_exact),
+    'gaussian': (gaussian, _gaussian_exact),
+    'continuous': (continuous, _continuous_exact),
+    'discontinuous': (discontinuous, _discontinuous_exact),
+}
+
+# The difficulty of each family: the sum of the entries of a.
+difficulty = {
+    'oscillatory': 9.0,
+    'product_peak': 7.25,
+    'corner_peak': 1.85,
+    'gaussian': 7.03,
+    'continuous': 20.4,
+    'discontinuous': 4.3,
+}
+
+def draw(family, d, draws, rng=None):
+    '''
+    Draw random parameters a and u (each of shape (draws, d)) for one of
+    the `families`: u is uniform on [0, 1]**d, and a is uniform on
+    [0, 1]**d, rescaled to sum to `difficulty[family]`.
+    '''
+    rng = np.random.default_rng(rng)
+    a = rng.random((draws, d))
+    u = rng.random((draws, d))
+    a *= difficulty[family]/np.sum(a, axis=1, keepdims=True)
+    return a, u
+
+def profile(rules, d=2, draws=100, names=None, seed=None, repeat=3):
+    '''
+    Profile cubature rules on the Genz test families:
+    
+    Each rule in `rules` (a dictionary mapping names to rules on [-1, 1]**d,
+    in any format accepted by `integrate.integrate`, or to functions of no
+    arguments returning one) is applied to `draws` random members of each
+    family named in `names` (by default, all of them), rescaled from
+    [0, 1]**d. All draws are evaluated in one batch, and timed over the
+    best of `repeat` runs. Every rule sees the same draws. For example,
+    
+        profile({'rr_28pt': square.rr_28pt,
+                 'prod_gauss(6, 6)': lambda: square.prod_gauss(6, 6)})
+    
+    Returns a list of dictionaries, one for each rule and family, with the
+    number of integrand evaluations per integral ('evaluations'), the median
+    and maximum relative errors over the draws, the time per integral in
+    seconds, the evaluations per second, and the number of correct digits
+    gained per evaluation (-log10 of the median error over 'evaluations').
+    
+    Genz, A., "Testing multidimensional integration routines", in Tools,
+    Methods and Languages for Scientific and Engineering Computation,
+    North-Holland, 1984, pp. 81-94.
+    '''
+    if names is None:
+        names = list(families)
+    rng = np.random.default_rng(seed)
+    parameters = {family: draw(family, d, draws, rng) for family in names}
+    results = []
+    for name, rule in rules.items():
+        if callable(rule):
+            rule = rule()
+        nodes, weights = unpack(rule)
+        if len(nodes) != d:
+            continue
+        x = [(coord + 1)/2 for coord in nodes]
+        w = weights/2**d
+        for family in names:
+            f, exact = families[family]
+            a, u = parameters[family]
+            best = np.inf
+            for _ in range(repeat):
+                start = time.perf_counter()
+                values = contract(evaluate(lambda *coords: f(coords, a, u), x), w)
+                best = min(best, time.perf_counter() - start)
+            truth = exact(a, u)
+            errors = np.abs(values - truth)/np.abs(truth)
+            median = np.median(errors)
+            results.append({
+                'rule': name,
+                'family': family,
+                'evaluations': len(w),
+                'median_error': median,
+                'max_error': np.max(errors),
+                'seconds': best/draws,
+                'evaluations_per_second': len(w)*draws/best,
+                'digits_per_evaluation': -np.log10(max(median, 1e-17))/len(w),
+            })
+    return results
+
+def table(results):
+    '''
+    Format the results of `profile` as a plain-text table.
+    '''
+    header = (f'{"rule":<24} {"family":<14} {"evals":>7} {"median err":>10} '
+              f'{"max err":>10} {"s/integral":>10} {"evals/s":>10}')
+    lines = [header, '-'*len(header)]
+    for r in results:
+        lines.append(f'{r["rule"]:<24} {r["family"]:<14} {r["evaluations"]:>7} '
+                     f'{r["median_error"]:>10.2e} {r["max_error"]:>10.2e} '
+                     f'{r["seconds"]:>10.2e} {r["evaluations_per_second"]:>10.2e}')
+    return '\n'.join(lines)
@@ -1,70 +1,225 @@
+import os
+import struct
+import tempfile
+import hashlib
+import inspect
+from functools import wraps
 from mpmath import mp
-from mpmath.matrices.eigen_symmetric import tridiag_eigen
-
-def gauss_hermite(n):
-    d = mp.matrix([mp.mpf('0.0') for _ in range(n)])
-    e = [mp.sqrt(k/2) for k in mp.arange(1,n)]
-    e.append(mp.mpf('0.0'))
-    e = mp.matrix(e)
-    z = mp.eye(n)[0,:]
-    
-    tridiag_eigen(mp, d, e, z)
-    z = mp.sqrt(mp.pi)*z.apply(lambda x: x**2)
-    return d, z.T
-
-def gauss_laguerre(n):
-    d = mp.matrix(mp.arange(1,2*n,2))
-    e = mp.matrix(mp.arange(-1,-n-1,-1))
-    z = mp.eye(n)[0,:]
-    
-    tridiag_eigen(mp, d, e, z)
-    z = z.apply(lambda x: x**2)
-    return d, z.T
-
-def gauss_genlaguerre(n, alpha):
-    d = mp.matrix([i + alpha for i in mp.arange(1,2*n,2)])
-    e = [-mp.sqrt(k*(k + alpha)) for k in mp.arange(1,n)]
-    e.append(mp.mpf('0.0'))
-    e = mp.matrix(e)
-    z = mp.eye(n)[0,:]
+from scipy import special
+
+# Directory for the persistent rule cache. Rules are only cached if this
+# is set, either here, through `set_cache_dir`, or via $CUBIT_CACHE_DIR.
+cache_dir = os.environ.get('CUBIT_CACHE_DIR')
+
+_MAGIC = b'CUBITGW1'
+
+def set_cache_dir(path):
+    '''
+    Set the directory used to cache computed rules between processes.
+    Pass None to disable the cache.
+    '''
+    global cache_dir
+    cache_dir = path
+
+def _cache_path(family, n, params):
+    key = ','.join(f'{name}={mp.nstr(mp.mpf(value), mp.dps + 5)}'
+                   for name, value in params.items())
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f'{family}-{n}-{digest}-{mp.dps}.bin')
+
+def _write_mpfs(f, values):
+    for value in values:
+        sign, man, exp, bc = mp.mpf(value)._mpf_
+        man = int(man)
+        data = man.to_bytes((man.bit_length() + 7)//8, 'little')
+        f.write(struct.pack('<bqI', sign, exp, len(data)))
+        f.write(data)
+
+def _read_mpfs(f, n):
+    values = []
+    for _ in range(n):
+        sign, exp, size = struct.unpack('<bqI', f.read(13))
+        man = int.from_bytes(f.read(size), 'little')
+        values.append(mp.make_mpf((sign, man, exp, man.bit_length())))
+    return values
+
+def _load(path):
+    with open(path, 'rb') as f:
+        magic, n = struct.unpack('<8sI', f.read(12))
+        if magic != _MAGIC:
+            raise ValueError(f'{path} is not a cached cubit rule')
+        nodes = _read_mpfs(f, n)
+        weights = _read_mpfs(f, n)
+    return mp.matrix(nodes), mp.matrix(weights)
+
+def _save(path, nodes, weights):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temporary file in the same directory and rename it into
+    # place, so concurrent readers never see a partially written rule
+    # and concurrent writers of the same rule cannot corrupt each other.
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(struct.pack('<8sI', _MAGIC, len(nodes)))
+            _write_mpfs(f, nodes)
+            _write_mpfs(f, weights)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def persistent(family):
+    '''
+    Cache the rules computed by the decorated function on disk, keyed by
+    `family`, the number of points, the remaining parameters and `mp.dps`.
+    Parameters are keyed by name, whether they are passed by position or
+    by keyword, and `processes` is not part of the key.
+    Cached rules are only read when they are requested.
+    '''
+    def decorator(func):
+        signature = inspect.signature(func)
+        
+        @wraps(func)
+        def wrapper(n, *params, **kwargs):
+            if cache_dir is None:
+                return func(n, *params, **kwargs)
+            bound = signature.bind(n, *params, **kwargs)
+            bound.apply_defaults()
+            key = {name: value for name, value in bound.arguments.items()
+                   if name not in ('n', 'processes')}
+            path = _cache_path(family, n, key)
+            try:
+                return _load(path)
+            except (OSError, ValueError, struct.error):
+                pass
+            nodes, weights = func(n, *params, **kwargs)
+            _save(path, nodes, weights)
+            return nodes, weights
+        return wrapper
+    return decorator
+
+def gauss(d, e, mu0, seeds, processes=None):
+    '''
+    Compute a Gauss rule at the current `mp.dps` from the recurrence
+    coefficients of the corresponding orthonormal polynomials,
+        e[k] p_{k+1}(x) = (x - d[k]) p_k(x) - e[k-1] p_{k-1}(x),
+    where `d` holds the n diagonal and `e` the n-1 off-diagonal entries of
+    the Jacobi matrix, and `mu0` is the integral of the weight function.
     
-    tridiag_eigen(mp, d, e, z)
-    z = mp.gamma(alpha + 1)*z.apply(lambda x: x**2)
-    return d, z.T
-
-def gauss_legendre(n):
-    d = mp.matrix([mp.mpf('0.0') for _ in range(n)])
-    e = [k/mp.sqrt(4*k**2 - 1) for k in mp.arange(1,n)]
-    e.append(mp.mpf('0.0'))
-    e = mp.matrix(e)
-    z = mp.eye(n)[0,:]
+    Each node is refined from its double-precision approximation in `seeds`
+    by Newton's method on the three-term recurrence, and the weights are
+    obtained from the Christoffel function, 1/Σ p_k(x)**2. This takes
+    O(n**2) operations, rather than the O(n**3) of the eigenvector problem.
+    If `processes` is given, the nodes are split between that many worker
+    processes.
     
-    tridiag_eigen(mp, d, e, z)
-    z = 2*z.apply(lambda x: x**2)
-    return d, z.T
+    Returns the nodes and weights as n×1 mpmath matrices.
+    '''
+    d = [mp.mpf(x) for x in d]
+    e = [mp.mpf(x) for x in e]
+    mu0 = mp.mpf(mu0)
+    seeds = sorted(mp.mpf(float(x)) for x in seeds)
+    # For symmetric weight functions, only refine the nonnegative nodes.
+    symmetric = all(x == 0 for x in d)
+    if symmetric:
+        seeds = seeds[len(seeds)//2:]
+    if processes is None or processes <= 1:
+        results = _refine(mp.dps, d, e, mu0, seeds)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        size = -(-len(seeds)//processes)
+        chunks = [seeds[i:i + size] for i in range(0, len(seeds), size)]
+        with ProcessPoolExecutor(processes) as executor:
+            futures = [executor.submit(_refine, mp.dps, d, e, mu0, chunk)
+                       for chunk in chunks]
+            results = [result for future in futures for result in future.result()]
+    if symmetric:
+        mirror = results[len(d) % 2:][::-1]
+        results = [(-x, w) for x, w in mirror] + results
+    nodes, weights = zip(*results)
+    return mp.matrix(list(nodes)), mp.matrix(list(weights))
+
+def _refine(dps, d, e, mu0, seeds):
+    with mp.workdps(dps):
+        n = len(d)
+        p0 = 1/mp.sqrt(mu0)
+        tol = mp.mpf(2)**(-mp.prec + 4)
+        results = []
+        for x in seeds:
+            for _ in range(100):
+                # Evaluate (unnormalized) p_n and its derivative at x,
+                # accumulating Σ p_k**2 for the weight along the way.
+                prev, cur = mp.zero, p0
+                dprev, dcur = mp.zero, mp.zero
+                sqsum = cur**2
+                for k in range(n):
+                    lower = e[k-1] if k > 0 else mp.zero
+                    upper = e[k] if k < n - 1 else mp.one
+                    nxt = ((x - d[k])*cur - lower*prev)/upper
+                    dnxt = (cur + (x - d[k])*dcur - lower*dprev)/upper
+                    prev, cur = cur, nxt
+                    dprev, dcur = dcur, dnxt
+                    if k < n - 1:
+                        sqsum += cur**2
+                step = cur/dcur
+                x -= step
+                if abs(step) <= tol*max(1, abs(x)):
+                    break
+            results.append((x, 1/sqsum))
+        return results
+
+@persistent('hermite')
+def gauss_hermite(n, processes=None):
+    d = [0]*n
+    e = [mp.sqrt(mp.mpf(k)/2) for k in range(1, n)]
+    seeds = special.roots_hermite(n)[0]
+    return gauss(d, e, mp.sqrt(mp.pi), seeds, processes)
+
+@persistent('laguerre')
+def gauss_laguerre(n, processes=None):
+    d = [2*k + 1 for k in range(n)]
+    e = [k for k in range(1, n)]
+    seeds = special.roots_laguerre(n)[0]
+    return gauss(d, e, 1, seeds, processes)
 
-def gauss_gegenbauer(n, alpha):
-    d = mp.matrix([mp.mpf('0.0') for _ in range(n)])
+@persistent('genlaguerre')
+def gauss_genlaguerre(n, alpha, processes=None):
+    alpha = mp.mpf(alpha)
+    d = [2*k + 1 + alpha for k in range(n)]
+    e = [mp.sqrt(k*(k + alpha)) for k in range(1, n)]
+    seeds = special.roots_genlaguerre(n, float(alpha))[0]
+    return gauss(d, e, mp.gamma(alpha + 1), seeds, processes)
+
+@persistent('legendre')
+def gauss_legendre(n, processes=None):
+    d = [0]*n
+    e = [k/mp.sqrt(4*k**2 - 1) for k in range(1, n)]
+    seeds = special.roots_legendre(n)[0]
+    return gauss(d, e, 2, seeds, processes)
+
+@persistent('gegenbauer')
+def gauss_gegenbauer(n, alpha, processes=None):
+    alpha = mp.mpf(alpha)
+    d = [0]*n
     e = [mp.sqrt(k*(k + 2*alpha - 1)/((2*k + 2*alpha - 1)**2 - 1))
-         for k in mp.arange(1,n)]
-    e.append(mp.mpf('0.0'))
-    e = mp.matrix(e)
-    z = mp.eye(n)[0,:]
-    
-    tridiag_eigen(mp, d, e, z)
-    z = 2**(2*alpha)*mp.beta(alpha + 1/2, alpha + 1/2)*z.apply(lambda x: x**2)
-    return d, z.T
-
-def gauss_jacobi(n, alpha, beta):
-    d = mp.matrix([(beta**2 - alpha**2)/(2*k + alpha + beta)/(2*k + alpha + beta - 2)
-                   for k in mp.arange(1,n+1)])
-    e = [k*(k + alpha)*(k + beta)*(k + alpha + beta)/((2*k + alpha + beta)**2 - 1)
-         for k in mp.arange(1,n)]
-    e = [2/(2*k + alpha + beta)*mp.sqrt(x) for k, x in zip(mp.arange(1,n), e)]
-    e.append(mp.mpf('0.0'))
-    e = mp.matrix(e)
-    z = mp.eye(n)[0,:]
-    
-    tridiag_eigen(mp, d, e, z)
-    z = 2**(alpha + beta + 1)*mp.beta(alpha + 1, beta + 1)*z.apply(lambda x: x**2)
-    return d, z.T
+         for k in range(1, n)]
+    mu0 = 2**(2*alpha)*mp.beta(alpha + 1/2, alpha + 1/2)
+    seeds = special.roots_gegenbauer(n, float(alpha))[0]
+    return gauss(d, e, mu0, seeds, processes)
+
+@persistent('jacobi')
+def gauss_jacobi(n, alpha, beta, processes=None):
+    alpha, beta = mp.mpf(alpha), mp.mpf(beta)
+    d = [(beta - alpha)/(alpha + beta + 2)]
+    d += [(beta**2 - alpha**2)/(2*k + alpha + beta)/(2*k + alpha + beta - 2)
+          for k in range(2, n+1)]
+    # For k = 1, the factor k + alpha + beta of (2k + alpha + beta)**2 - 1
+    # cancels; it is 0 when alpha + beta = -1.
+    e = [2/(alpha + beta + 2)*mp.sqrt((1 + alpha)*(1 + beta)/(alpha + beta + 3))]
+    e += [2/(2*k + alpha + beta)*mp.sqrt(k*(k + alpha)*(k + beta)*(k + alpha + beta)
+                                         /((2*k + alpha + beta)**2 - 1))
+          for k in range(2, n)]
+    e = e[:n-1]
+    mu0 = 2**(alpha + beta + 1)*mp.beta(alpha + 1, beta + 1)
+    seeds = special.roots_jacobi(n, float(alpha), float(beta))[0]
+    return gauss(d, e, mu0, seeds, processes)
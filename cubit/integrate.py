@@ -0,0 +1,89 @@
+import numpy as np
+from cubit.rule import Rule
+
+def unpack(rule):
+    '''
+    Bring a rule returned by any cubit constructor into a common layout.
+
+    Accepts `(nodes, weights)` where `nodes` is a one-dimensional array,
+    a d×n array or a tuple of d coordinate arrays, as well as the flat
+    `(x, y, weights)` form used by some rules.
+
+    Returns a tuple of d one-dimensional coordinate arrays and
+    the one-dimensional array of weights.
+    Also accepts a `rule.Rule`, whose coordinates are returned as views,
+    and lazy rules such as `tensor.TensorRule` and `qmc.QMCRule` (anything
+    with a `materialize` method), which are materialized.
+    '''
+    if isinstance(rule, Rule):
+        return rule.coords, rule.weights
+    if hasattr(rule, 'materialize'):
+        rule = rule.materialize()
+    if len(rule) == 2:
+        nodes, weights = rule
+    else:
+        *nodes, weights = rule
+    if isinstance(nodes, np.ndarray):
+        nodes = (nodes,) if nodes.ndim == 1 else tuple(nodes)
+    else:
+        nodes = tuple(np.asarray(coord) for coord in nodes)
+    return nodes, np.asarray(weights)
+
+def evaluate(f, nodes):
+    '''
+    Evaluate an integrand, or a sequence of integrands, at the given
+    coordinate arrays. The result has the nodes along its last axis; a
+    sequence of k integrands adds a leading axis of length k.
+    '''
+    if callable(f):
+        return node_axis(f(*nodes), len(nodes[0]))
+    return np.stack(np.broadcast_arrays(*(evaluate(g, nodes) for g in f)))
+
+def node_axis(values, n):
+    '''
+    Give integrand values for n nodes a last axis of length n, broadcasting
+    values that do not depend on the nodes (such as constants).
+    '''
+    values = np.asarray(values)
+    if values.shape[-1:] != (n,):
+        values = np.broadcast_to(values[..., np.newaxis], values.shape + (n,))
+    return values
+
+def contract(values, weights):
+    '''
+    Contract the last (node) axis of `values` against `weights`
+    as a single matrix-vector product.
+    '''
+    shape = values.shape[:-1]
+    return (values.reshape(-1, values.shape[-1]) @ weights).reshape(shape)
+
+def integrate(f, rule, chunksize=None):
+    '''
+    Integrate `f` using a cubature rule.
+
+    `f` is called as `f(*nodes)`, once for all nodes (or once per chunk
+    of `chunksize` nodes), and should return an array whose last axis runs
+    over the nodes. Array-valued integrands thus give array-valued
+    integrals. A sequence of integrands is evaluated on the same nodes
+    and the integrals are returned stacked along the first axis.
+
+    `rule` may be anything returned by a cubit rule constructor. With a
+    `chunksize`, a lazy rule (anything with a `blocks` method, such as
+    `tensor.TensorRule`) is integrated block by block without
+    materializing it.
+    '''
+    if hasattr(rule, 'blocks') and chunksize is not None:
+        total = 0
+        for nodes, weights in rule.blocks(chunksize):
+            total = total + contract(evaluate(f, nodes), weights)
+        return total
+    nodes, weights = unpack(rule)
+    n = len(weights)
+    if chunksize is None or chunksize >= n:
+        return contract(evaluate(f, nodes), weights)
+    total = 0
+    for start in range(0, n, chunksize):
+        chunk = slice(start, start + chunksize)
+        values = evaluate(f, tuple(coord[chunk] for coord in nodes))
+        total = total + contract(values, weights[chunk])
+    return total
@@ -1,83 +1,481 @@
 import numpy as np
 from numpy import pi, sin, cos, exp, log, sqrt
+from numpy.polynomial import polynomial
 from scipy import linalg, special
+from mpmath import mp
+from cubit import cache, precision
 
-def gauss(n, lower=-1, upper=1):
+# Above this number of points, `gauss_legendre`, `gauss_gegenbauer` and
+# `gauss_jacobi` (and `ray.gauss_laguerre` and `ray.gauss_genlaguerre`)
+# switch from scipy's Golub-Welsch based generators to the O(n)
+# `gauss_legendre_asy`, `gauss_jacobi_asy` (for parameters up to
+# `asymptotic_max_parameter`) and `ray.gauss_laguerre_asy`.
+asymptotic_threshold = 100
+asymptotic_max_parameter = 10
+
+def affine(nodes, weights, lower=-1, upper=1):
+    '''
+    Map a rule on [-1, 1] onto the interval [lower, upper].
+    
+    `lower` and `upper` may also be arrays of bounds, in which case they
+    are broadcast against each other and the rule is mapped onto every
+    interval at once. The resulting nodes and weights then have shape
+    `(*bounds_shape, n)`, e.g. (k, n) for k intervals.
+    '''
+    if np.ndim(lower) == 0 and np.ndim(upper) == 0:
+        if lower == -1 and upper == 1:
+            return nodes, weights
+        return (upper+lower)/2 + (upper-lower)/2*nodes, (upper-lower)/2*weights
+    lower, upper = np.broadcast_arrays(lower, upper)
+    center = ((upper+lower)/2)[..., np.newaxis]
+    halfwidth = ((upper-lower)/2)[..., np.newaxis]
+    return center + halfwidth*nodes, halfwidth*weights
+
+def gauss(n, lower=-1, upper=1, dtype=None):
     '''
     Gaussian quadrature. This function aliases `gauss_legendre`.
     '''
-    return gauss_legendre(n, lower, upper)
+    return gauss_legendre(n, lower, upper, dtype)
 
-def gauss_legendre(n, lower=-1, upper=1):
+def gauss_legendre(n, lower=-1, upper=1, dtype=None):
     '''
     Gauss-Legendre quadrature:
     
     A rule of order 2*n-1 on the interval [lower, upper] 
     with respect to the weight function w(x) = 1.
+    `lower` and `upper` may be arrays of bounds (see `affine`).
+    `dtype` may be float32, float64 (the default) or longdouble; longdouble
+    rules are refined by Newton's method in longdouble arithmetic.
     '''
-    nodes, weights = special.roots_legendre(n)
-    if lower != -1 or upper != 1:
-        nodes = (upper+lower)/2 + (upper-lower)/2*nodes
-        weights = (upper-lower)/2*weights
-    return nodes, weights
+    if n > asymptotic_threshold:
+        nodes, weights = gauss_legendre_asy(n)
+    else:
+        nodes, weights = special.roots_legendre(n)
+    if precision.extended(dtype):
+        k = np.arange(1, n, dtype=dtype)
+        nodes, weights = precision.gauss(np.zeros(n), k/sqrt(4*k**2 - 1), 2,
+                                         nodes, dtype)
+    return precision.cast(affine(nodes, weights, lower, upper), dtype)
 
-def gauss_chebyshev(n, lower=-1, upper=1):
+def gauss_legendre_asy(n, boundary=10, terms=30):
+    '''
+    Gauss-Legendre quadrature for large n, computed in O(n) operations.
+    
+    Newton's method is applied in θ = arccos(x), starting from Tricomi's
+    approximation, using the asymptotic expansion of P_n(cos θ) with
+    `terms` terms. That expansion converges slowly for the `boundary` nodes
+    nearest each endpoint, which are instead found by stepping outward
+    from the last interior node with Taylor series of P_n generated from
+    Legendre's differential equation, as in the Glaser-Liu-Rokhlin method.
+    The weights are 2/(dP_n/dθ)**2.
+    
+    Hale, N., and Townsend, A., "Fast and accurate computation of
+    Gauss-Legendre and Gauss-Jacobi quadrature nodes and weights",
+    SIAM J. Sci. Comput., v. 35, 2013, pp. A652-A674.
+    
+    Glaser, A., Liu, X., and Rokhlin, V., "A fast algorithm for the
+    calculation of the roots of special functions",
+    SIAM J. Sci. Comput., v. 29, 2007, pp. 1420-1438.
+    '''
+    k = np.arange(1, (n+1)//2 + 1)
+    boundary = min(boundary, len(k) - 1)
+    theta = np.arccos((1 - 1/(8*n**2) + 1/(8*n**3))*cos(pi*(4*k - 1)/(4*n + 2)))
+    if n % 2 == 1:
+        theta[-1] = pi/2
+    
+    dP = np.empty_like(theta)
+    interior = slice(boundary, None)
+    for _ in range(10):
+        P, dP[interior] = _legendre_interior(n, theta[interior], terms)
+        step = P/dP[interior]
+        theta[interior] -= step
+        if np.max(np.abs(step)) <= 2*np.finfo(float).eps:
+            break
+    dP[interior] = _legendre_interior(n, theta[interior], terms)[1]
+    
+    # Step from each node to its neighbour nearer the endpoint, working
+    # with t = 1 - cos(θ) to keep full relative accuracy near x = 1.
+    for j in range(boundary - 1, -1, -1):
+        theta[j], dP[j] = _jacobi_taylor_step(n, 0, 0, theta[j+1], dP[j+1])
+    
+    x = cos(theta)
+    w = 2/dP**2
+    if n % 2 == 1:
+        return np.concatenate((-x[:-1], x[::-1])), np.concatenate((w[:-1], w[::-1]))
+    return np.concatenate((-x, x[::-1])), np.concatenate((w, w[::-1]))
+
+def _legendre_interior(n, theta, terms):
+    # P_n(cos θ) = C_n Σ h_m cos(α_m)/(2 sin θ)**(m+1/2), and its θ-derivative
+    C = sqrt(4/pi)*_gamma_ratio(n)
+    s = 2*sin(theta)
+    P = np.zeros_like(theta)
+    dP = np.zeros_like(theta)
+    h = 1
+    for m in range(terms):
+        if m > 0:
+            h *= (m - 1/2)**2/(m*(n + m + 1/2))
+        alpha = (n + m + 1/2)*theta - (m + 1/2)*pi/2
+        term = h/s**(m + 1/2)
+        P += term*cos(alpha)
+        dP -= term*((n + m + 1/2)*sin(alpha) + (m + 1/2)*cos(alpha)*2*cos(theta)/s)
+    return C*P, C*dP
+
+def _gamma_ratio(n, terms=12):
+    # Γ(n+1)/Γ(n+3/2), from the asymptotic series for log Γ(n+a) - log Γ(n+b)
+    # in terms of Bernoulli polynomials; accurate to rounding error for n > 50.
+    B = special.bernoulli(terms + 1)
+    bernoulli_poly = lambda m, x: sum(special.comb(m, j, exact=True)*B[j]*x**(m-j)
+                                      for j in range(m+1))
+    series = sum((-1)**(k+1)*(bernoulli_poly(k+1, 1) - bernoulli_poly(k+1, 3/2))
+                 /(k*(k+1)*n**k) for k in range(1, terms + 1))
+    return exp(series)/sqrt(n)
+
+def _jacobi_taylor_step(n, alpha, beta, theta0, dP0, terms=200):
+    # The node of P_n^(α,β) next to cos(θ0) towards x = 1, where dP/dθ = dP0,
+    # and dP/dθ there, from Taylor series in σ = (t - t0)/t0, t = 1 - x.
+    # The node is bracketed on a grid in -1/2 <= σ < 0 and found by Newton's
+    # method; if it is not there, the series is expanded again about t0/2.
+    t0 = 2*sin(theta0/2)**2
+    P0, dP0_dt = 0.0, dP0/sin(theta0)
+    sigma = -np.arange(129)/256
+    while True:
+        q = _jacobi_series(n, alpha, beta, t0, P0, dP0_dt*t0, terms)
+        dq = polynomial.polyder(q)
+        values = polynomial.polyval(sigma, q)
+        start = 1 if P0 == 0 else 0
+        change = np.nonzero(np.sign(values[start:]) != np.sign(values[start]))[0]
+        if len(change):
+            break
+        P0, dP0_dt = polynomial.polyval(-1/2, q), polynomial.polyval(-1/2, dq)/t0
+        t0 /= 2
+    i = start + change[0]
+    s = (sigma[i-1] + sigma[i])/2
+    for _ in range(20):
+        step = polynomial.polyval(s, q)/polynomial.polyval(s, dq)
+        s -= step
+        if abs(step) <= 2*np.finfo(float).eps*abs(s):
+            break
+    t = t0*(1 + s)
+    theta = 2*np.arcsin(sqrt(t/2))
+    return theta, polynomial.polyval(s, dq)/t0*sin(theta)
+
+def _jacobi_series(n, alpha, beta, t0, q0, q1, terms):
+    # Taylor coefficients in σ = (t - t0)/t0 of the solution of the Jacobi
+    # differential equation t(2-t) P'' + (2α + 2 - (α+β+2) t) P' + N P = 0,
+    # N = n(n+α+β+1), with the given value and σ-derivative at t0.
+    N = n*(n + alpha + beta + 1)
+    q = [q0, q1]
+    for m in range(terms - 2):
+        q.append(-(((2 - 2*t0)*m + 2*alpha + 2 - (alpha + beta + 2)*t0)*(m + 1)*q[m+1]
+                   + (N - m*(m + alpha + beta + 1))*t0*q[m])
+                 /((2 - t0)*(m + 2)*(m + 1)))
+    return np.array(q)
+
+def gauss_chebyshev(n, lower=-1, upper=1, dtype=None):
     '''
     Gauss-Chebyshev quadrature:
     
     A rule of order 2*n-1 on the interval [-1, 1]
     with respect to the weight function w(x) = 1/sqrt(1-x**2).
+    The nodes and weights are computed from their closed forms
+    in the working precision of `dtype`.
     '''
-    nodes, weights = special.roots_chebyt(n)
-    if lower != -1 or upper != 1:
-        nodes = (upper+lower)/2 + (upper-lower)/2*nodes
-        weights = (upper-lower)/2*weights
-    return nodes, weights
+    work = precision.working(dtype)
+    nodes = cos(np.arange(2*n - 1, 0, -2, dtype=work)*precision.pi(work)/(2*n))
+    weights = np.full(n, precision.pi(work)/n)
+    return precision.cast(affine(nodes, weights, lower, upper), dtype)
 
-def gauss_gegenbauer(n, alpha, lower=-1, upper=1):
+def gauss_gegenbauer(n, alpha, lower=-1, upper=1, dtype=None):
     '''
     Gauss-Gegenbauer quadrature:
     
     A rule of order 2*n-1 on the interval [-1, 1] with respect to
     the weight function w(x) = (1-x**2)**(alpha-1/2).
     '''
-    nodes, weights = special.roots_gegenbauer(n, alpha)
-    if lower != -1 or upper != 1:
-        nodes = (upper+lower)/2 + (upper-lower)/2*nodes
-        weights = (upper-lower)/2*weights
-    
-    return nodes, weights
+    if n > asymptotic_threshold and abs(alpha - 1/2) <= asymptotic_max_parameter:
+        nodes, weights = gauss_jacobi_asy(n, alpha - 1/2, alpha - 1/2)
+    else:
+        nodes, weights = special.roots_gegenbauer(n, alpha)
+    if precision.extended(dtype):
+        alpha = np.asarray(alpha, dtype=dtype)
+        k = np.arange(1, n, dtype=dtype)
+        e = sqrt(k*(k + 2*alpha - 1)/((2*k + 2*alpha - 1)**2 - 1))
+        mu0 = precision.evaluate(
+            lambda a: mp.sqrt(mp.pi)*mp.gamma(a + 0.5)/mp.gamma(a + 1), alpha, dtype=dtype)
+        nodes, weights = precision.gauss(np.zeros(n), e, mu0, nodes, dtype)
+    return precision.cast(affine(nodes, weights, lower, upper), dtype)
 
-def gauss_jacobi(n, alpha, beta, lower=-1, upper=1):
+def gauss_jacobi(n, alpha, beta, lower=-1, upper=1, dtype=None):
     '''
     Gauss-Jacobi quadrature:
     
     A rule of order 2*n-1 on the interval [-1, 1] with respect to
     the weight function w(x) = (1-x)**alpha*(1+x)**beta.
     '''
-    nodes, weights = special.roots_jacobi(n, alpha, beta)
-    if lower != -1 or upper != 1:
-        nodes = (upper+lower)/2 + (upper-lower)/2*nodes
-        weights = (upper-lower)/2*weights
+    if (n > asymptotic_threshold
+        and max(abs(alpha), abs(beta)) <= asymptotic_max_parameter):
+        nodes, weights = gauss_jacobi_asy(n, alpha, beta)
+    else:
+        nodes, weights = special.roots_jacobi(n, alpha, beta)
+    if precision.extended(dtype):
+        alpha, beta = np.asarray(alpha, dtype=dtype), np.asarray(beta, dtype=dtype)
+        k = np.arange(n, dtype=dtype)
+        s = 2*k + alpha + beta
+        with np.errstate(divide='ignore', invalid='ignore'):
+            d = (beta**2 - alpha**2)/(s*(s + 2))
+        d[0] = (beta - alpha)/(alpha + beta + 2)
+        k, s = k[1:], s[1:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            e = 2/s*sqrt(k*(k + alpha)*(k + beta)*(k + alpha + beta)/(s**2 - 1))
+        # For k = 1, k + α + β = s - 1 cancels; it is 0 when α + β = -1.
+        e[:1] = 2/s[:1]*sqrt((1 + alpha)*(1 + beta)/(s[:1] + 1))
+        mu0 = precision.evaluate(lambda a, b: 2**(a + b + 1)*mp.beta(a + 1, b + 1),
+                                 alpha, beta, dtype=dtype)
+        nodes, weights = precision.gauss(d, e, mu0, nodes, dtype)
+    return precision.cast(affine(nodes, weights, lower, upper), dtype)
+
+def gauss_jacobi_asy(n, alpha, beta, boundary=10, terms=30):
+    '''
+    Gauss-Jacobi quadrature for large n, computed in O(n) operations.
     
+    As in `gauss_legendre_asy`, Newton's method is applied in θ = arccos(x),
+    starting from the approximation of Gatteschi and Pittaluga, using Hahn's
+    asymptotic expansion of P_n^(α,β)(cos θ) with at most `terms` terms (as
+    many as each node needs), and the `boundary` nodes nearest each endpoint
+    are found by Taylor steps from the Jacobi differential equation. The
+    nodes in [-1, 0) are found in the same way as the nodes in (0, 1] of
+    P_n^(β,α)(-x), to keep full accuracy near x = -1. The weights, which are
+    proportional to 1/(dP_n/dθ)**2, are scaled to sum to the integral of the
+    weight function.
+    
+    Hale, N., and Townsend, A., "Fast and accurate computation of
+    Gauss-Legendre and Gauss-Jacobi quadrature nodes and weights",
+    SIAM J. Sci. Comput., v. 35, 2013, pp. A652-A674.
+    '''
+    right = np.count_nonzero(_jacobi_guess(n, alpha, beta, n) <= pi/2)
+    theta_right, dP_right = _jacobi_half(n, alpha, beta, right, boundary, terms)
+    theta_left, dP_left = _jacobi_half(n, beta, alpha, n - right, boundary, terms)
+    nodes = np.concatenate((-cos(theta_left), cos(theta_right[::-1])))
+    weights = 1/np.concatenate((dP_left, dP_right[::-1]))**2
+    weights *= 2**(alpha + beta + 1)*special.beta(alpha + 1, beta + 1)/np.sum(weights)
     return nodes, weights
 
-def beta(n, alpha, beta):
+def _jacobi_guess(n, alpha, beta, count):
+    # Gatteschi and Pittaluga's approximation to the first `count` nodes in θ
+    rho = n + (alpha + beta + 1)/2
+    phi = (np.arange(1, count + 1) + alpha/2 - 1/4)*pi/rho
+    return phi + ((1/4 - alpha**2)/np.tan(phi/2) - (1/4 - beta**2)*np.tan(phi/2))/(4*rho**2)
+
+def _jacobi_half(n, alpha, beta, count, boundary, terms):
+    # The `count` nodes of P_n^(α,β) nearest x = 1, in θ, and dP/dθ there
+    theta = _jacobi_guess(n, alpha, beta, count)
+    boundary = min(boundary, count - 1)
+    dP = np.empty_like(theta)
+    interior = slice(boundary, None)
+    for _ in range(10):
+        P, dP[interior] = _jacobi_interior(n, alpha, beta, theta[interior], terms)
+        step = P/dP[interior]
+        theta[interior] -= step
+        if np.max(np.abs(step)) <= 2*np.finfo(float).eps:
+            break
+    dP[interior] = _jacobi_interior(n, alpha, beta, theta[interior], terms)[1]
+    for j in range(boundary - 1, -1, -1):
+        theta[j], dP[j] = _jacobi_taylor_step(n, alpha, beta, theta[j+1], dP[j+1])
+    return theta, dP
+
+def _jacobi_interior(n, alpha, beta, theta, terms):
+    # P_n^(α,β)(cos θ) up to a constant factor, and its θ-derivative, from
+    #   Σ_m Σ_l C_ml cos(((2ρ+m)θ - (α+l+1/2)π)/2)
+    #       / (2**m (2ρ+1)_m sin(θ/2)**(l+α+1/2) cos(θ/2)**(m-l+β+1/2)).
+    # The inner sum is a polynomial in w = -i cot(θ/2), and terms are only
+    # added for the nodes at which the previous term was not negligible.
+    rho = n + (alpha + beta + 1)/2
+    l = np.arange(terms)
+    A = np.cumprod(np.concatenate(([1], (l[:-1] + 1/2 + alpha)*(l[:-1] + 1/2 - alpha)
+                                         /(l[:-1] + 1))))
+    B = np.cumprod(np.concatenate(([1], (l[:-1] + 1/2 + beta)*(l[:-1] + 1/2 - beta)
+                                         /(l[:-1] + 1))))
+    P = np.zeros_like(theta)
+    dP = np.zeros_like(theta)
+    active = np.arange(len(theta))
+    scale = 1
+    tol = np.finfo(float).eps/16
+    for m in range(terms):
+        if m > 0:
+            scale /= 2*(2*rho + m)
+        t = theta[active]
+        cot, tan = 1/np.tan(t/2), np.tan(t/2)
+        w = -1j*cot
+        S = np.zeros_like(w)
+        dS = np.zeros_like(w)
+        for k in range(m, -1, -1):
+            dS = dS*w + S
+            S = S*w + A[k]*B[m-k]
+        dS *= 1j*(1 + cot**2)/2
+        E = np.exp(1j*((2*rho + m)*t - (alpha + 1/2)*pi)/2)*scale/cos(t/2)**m
+        term = np.real(E*S)
+        dterm = np.real(E*(dS + 1j*(2*rho + m)/2*S)) + m*tan/2*term
+        P[active] += term
+        dP[active] += dterm
+        active = active[(np.abs(term) > tol) | (np.abs(dterm) > tol*rho)]
+        if len(active) == 0:
+            break
+    half = theta/2
+    base = sin(half)**-(alpha + 1/2)*cos(half)**-(beta + 1/2)
+    dbase = ((beta + 1/2)*np.tan(half) - (alpha + 1/2)/np.tan(half))/2
+    return base*P, base*(dP + dbase*P)
+
+def gauss_kronrod(lower=-1, upper=1, dtype=None):
+    '''
+    Gauss-Kronrod 7-15 rule:
+    
+    A rule of order 23 on the interval [lower, upper] with 15 points,
+    seven of which are the nodes of the Gauss-Legendre rule with n = 7.
+    Returns the nodes, the Kronrod weights, and the Gauss weights
+    (zero at the nodes added by Kronrod's extension), so that the
+    difference between the two estimates can serve as an error estimate.
+    
+    Piessens, R., de Doncker-Kapenga, E., Uberhuber, C. W., and Kahaner, D.,
+    "QUADPACK: A Subroutine Package for Automatic Integration",
+    Springer, 1983.
+    '''
+    xgk = np.array([0.991455371120812639206854697526329,
+                    0.949107912342758524526189684047851,
+                    0.864864423359769072789712788640926,
+                    0.741531185599394439863864773280788,
+                    0.586087235467691130294144845693013,
+                    0.405845151377397166906606412076961,
+                    0.207784955007898467600689403773245])
+    wgk = np.array([0.022935322010529224963732008058970,
+                    0.063092092629978553290700663189204,
+                    0.104790010322250183839876322541518,
+                    0.140653259715525918745189590510238,
+                    0.169004726639267902826583426598550,
+                    0.190350578064785409913256402421014,
+                    0.204432940075298892414161999234649])
+    wg = np.array([0, 0.129484966168869693270611432679082,
+                   0, 0.279705391489276667901467771423780,
+                   0, 0.381830050505118944950369775488975, 0])
+    nodes = np.concatenate((-xgk, [0], xgk[::-1]))
+    kronrod_weights = np.concatenate((wgk, [0.209482141084727828012999174891714],
+                                      wgk[::-1]))
+    gauss_weights = np.concatenate((wg, [0.417959183673469387755102040816327],
+                                    wg[::-1]))
+    _, gauss_weights = affine(nodes, gauss_weights, lower, upper)
+    nodes, kronrod_weights = affine(nodes, kronrod_weights, lower, upper)
+    return precision.cast((nodes, kronrod_weights, gauss_weights), dtype)
+
+def beta(n, alpha, beta, dtype=None):
     '''
     Gauss-Jacobi quadrature:
     
     A rule of order 2*n-1 on the interval [0, 1] with respect to the PDF of a
     beta distribution with shape parameters `alpha` and `beta`.
     '''
-    nodes, weights = gauss_jacobi(alpha - 1, beta - 1)
+    nodes, weights = gauss_jacobi(n, beta - 1, alpha - 1,
+                                  dtype=precision.working(dtype))
     
-    nodes = 1/2*(1 + nodes)
+    nodes = (1 + nodes)/2
     weights /= np.sum(weights)
     
-    return nodes, weights
+    return precision.cast((nodes, weights), dtype)
+    
+
+def clenshaw_curtis(n, lower=-1, upper=1, dtype=None):
+    '''
+    Clenshaw-Curtis quadrature:
+    
+    A rule of order n-1 on the interval [lower, upper] using n points,
+    the extrema of the Chebyshev polynomial T_{n-1} (including the
+    endpoints). The weights are all positive. Rules with n = 2**k + 1
+    points are nested, each reusing all the points of the one before.
+    The weights are computed with an FFT in O(n log n) operations.
     
+    Clenshaw, C. W., and Curtis, A. R., "A method for numerical integration
+    on an automatic computer", Numer. Math., v. 2, 1960, pp. 197-205.
+    
+    Waldvogel, J., "Fast construction of the Fejér and Clenshaw-Curtis
+    quadrature rules", BIT Numer. Math., v. 46, 2006, pp. 195-202.
+    '''
+    work = precision.working(dtype)
+    N = max(n - 1, 1)
+    if n <= 2:
+        # The midpoint and trapezoid rules
+        weights = np.full(n, work.type(2)/n)
+    else:
+        v, l, m = _fejer2_moments(N, work)
+        g = -np.ones(N, dtype=work)
+        g[l] += N
+        g[m] += N
+        g /= N**2 - 1 + N % 2
+        weights = np.fft.ifft(v + g).real
+        weights = _symmetrize(np.concatenate((weights, weights[:1])))
+    nodes = _chebyshev_points(n, N, work)
+    return precision.cast(affine(nodes, weights, lower, upper), dtype)
+
+def fejer1(n, lower=-1, upper=1, dtype=None):
+    '''
+    Fejér's first rule:
+    
+    A rule of order n-1 on the interval [lower, upper] using n points,
+    the zeros of the Chebyshev polynomial T_n (excluding the endpoints).
+    The weights are all positive. Rules with n = 3**k points are nested,
+    each reusing all the points of the one before.
+    The weights are computed with an FFT in O(n log n) operations.
+    
+    Waldvogel, J., "Fast construction of the Fejér and Clenshaw-Curtis
+    quadrature rules", BIT Numer. Math., v. 46, 2006, pp. 195-202.
+    '''
+    work = precision.working(dtype)
+    l = len(range(1, n, 2))
+    k = np.arange(n - l, dtype=work)
+    v = np.zeros(n + 1, dtype=np.result_type(work, np.complex128))
+    v[:n-l] = 2*np.exp(1j*precision.pi(work)*k/n)/(1 - 4*k**2)
+    v = v[:-1] + np.conj(v[:0:-1])
+    weights = _symmetrize(np.fft.ifft(v).real)
+    nodes = _chebyshev_points(n, n, work)
+    return precision.cast(affine(nodes, weights, lower, upper), dtype)
 
-def trapz(m, lower=-1, upper=1):
+def fejer2(n, lower=-1, upper=1, dtype=None):
+    '''
+    Fejér's second rule:
+    
+    A rule of order n-1 on the interval [lower, upper] using n points,
+    the interior extrema of the Chebyshev polynomial T_{n+1}, which are
+    the nodes of the Clenshaw-Curtis rule with n + 2 points, less the
+    endpoints. The weights are all positive. Rules with n = 2**k - 1
+    points are nested, each reusing all the points of the one before.
+    The weights are computed with an FFT in O(n log n) operations.
+    
+    Waldvogel, J., "Fast construction of the Fejér and Clenshaw-Curtis
+    quadrature rules", BIT Numer. Math., v. 46, 2006, pp. 195-202.
+    '''
+    work = precision.working(dtype)
+    N = n + 1
+    v, _, _ = _fejer2_moments(N, work)
+    weights = _symmetrize(np.fft.ifft(v).real[1:])
+    nodes = _chebyshev_points(n, N, work)
+    return precision.cast(affine(nodes, weights, lower, upper), dtype)
+
+def _fejer2_moments(N, work):
+    # The vector whose inverse DFT gives Fejér's second rule with N
+    # subintervals (Waldvogel's v2), along with the positions l and m
+    # at which the Clenshaw-Curtis correction is applied.
+    odd = np.arange(1, N, 2, dtype=work)
+    l = len(odd)
+    m = N - l
+    v = np.concatenate((2/odd/(odd - 2), [1/odd[-1]], np.zeros(m, dtype=work)))
+    return -v[:-1] - v[:0:-1], l, m
+
+def _chebyshev_points(n, N, work):
+    # cos(π(j + (N-n)/2)/N) in increasing order, written as a sine so that
+    # the points are exactly symmetric about 0 and nested rules coincide
+    return sin(precision.pi(work)*(2*np.arange(n, dtype=work) - n + 1)/(2*N))
+
+def _symmetrize(weights):
+    return (weights + weights[::-1])/2
+
+def trapz(m, lower=-1, upper=1, dtype=None):
     '''
     Trapezoid rule:
     
@@ -85,13 +483,15 @@ def trapz(m, lower=-1, upper=1):
     this is the first of the Newton-Cotes rules.
     The total number of evaluation points is m + 1.
     '''
+    work = precision.working(dtype)
+    lower, upper = work.type(lower), work.type(upper)
     h = (upper-lower)/m
     nodes = np.linspace(lower, upper, m+1)
     weights = np.full(m+1, h)
     weights[0] = weights[-1] = h/2
-    return nodes, weights
+    return precision.cast((nodes, weights), dtype)
 
-def midpt(m, lower=-1, upper=1):
+def midpt(m, lower=-1, upper=1, dtype=None):
     '''
     Midpoint rule:
     
@@ -99,12 +499,14 @@ def midpt(m, lower=-1, upper=1):
     corresponding to the composite Gauss rule with n = 1.
     The total number of evaluation points is m.
     '''
+    work = precision.working(dtype)
+    lower, upper = work.type(lower), work.type(upper)
     h = (upper-lower)/m
     nodes = np.linspace(lower + h/2, upper - h/2, m)
     weights = np.full(m, h)
-    return nodes, weights
+    return precision.cast((nodes, weights), dtype)
 
-def simps(m, lower=-1, upper=1):
+def simps(m, lower=-1, upper=1, dtype=None):
     '''
     Simpson's rule:
     
@@ -112,15 +514,17 @@ def simps(m, lower=-1, upper=1):
     corresponding to the Newton-Cotes rule with n = 3.
     The total number of evaluation points is 2*m + 1.
     '''
+    work = precision.working(dtype)
+    lower, upper = work.type(lower), work.type(upper)
     h = (upper-lower)/m
     nodes = np.linspace(lower, upper, 2*m + 1)
-    weights = np.empty(2*m + 1)
+    weights = np.empty(2*m + 1, dtype=work)
     weights[0] = weights[-1] = h/6
-    weights[1::2] = 2/3*h
+    weights[1::2] = 2*h/3
     weights[2:-1:2] = h/3
-    return nodes, weights
+    return precision.cast((nodes, weights), dtype)
     
-def simps38(m, lower=-1, upper=1):
+def simps38(m, lower=-1, upper=1, dtype=None):
     '''
     Simpson's 3/8 rule:
     
@@ -130,16 +534,18 @@ def simps38(m, lower=-1, upper=1):
     its order is the same. The total number of evaluation points is
     3*m + 1.
     '''
+    work = precision.working(dtype)
+    lower, upper = work.type(lower), work.type(upper)
     h = (upper-lower)/m
     nodes = np.linspace(lower, upper, 3*m + 1)
-    weights = np.empty(3*m + 1)
+    weights = np.empty(3*m + 1, dtype=work)
     weights[0] = weights[-1] = h/8
-    weights[1::3] = 3/8*h
-    weights[2::3] = 3/8*h
+    weights[1::3] = 3*h/8
+    weights[2::3] = 3*h/8
     weights[3:-1:3] = h/4
-    return nodes, weights
+    return precision.cast((nodes, weights), dtype)
 
-def boole(m, lower=-1, upper=1):
+def boole(m, lower=-1, upper=1, dtype=None):
     '''
     Boole's rule:
     
@@ -149,17 +555,19 @@ def boole(m, lower=-1, upper=1):
     its points are symmetrically distributed within each subinterval.
     The total number of evaluation points is 4*m + 1.
     '''
+    work = precision.working(dtype)
+    lower, upper = work.type(lower), work.type(upper)
     h = (upper-lower)/m
     nodes = np.linspace(lower, upper, 4*m + 1)
-    weights = np.empty(4*m + 1)
-    weights[0] = weights [-1] = 7/90*h
-    weights[1::4] = 16/45*h
-    weights[2::4] = 2/15*h
-    weights[3::4] = 16/45*h
-    weights[4:-1:4] = 7/45*h
-    return nodes, weights
+    weights = np.empty(4*m + 1, dtype=work)
+    weights[0] = weights [-1] = 7*h/90
+    weights[1::4] = 16*h/45
+    weights[2::4] = 2*h/15
+    weights[3::4] = 16*h/45
+    weights[4:-1:4] = 7*h/45
+    return precision.cast((nodes, weights), dtype)
     
-def newton_cotes(m, n, lower=-1, upper=1):
+def newton_cotes(m, n, lower=-1, upper=1, dtype=None):
     '''
     Newton-Cotes rules:
     
@@ -170,29 +578,40 @@ def newton_cotes(m, n, lower=-1, upper=1):
     High-order rules of this type can suffer from Runge's phenomenon.
     The total number of evaluation points is (n-1)*m + 1.
     '''
+    work = precision.working(dtype)
+    lower, upper = work.type(lower), work.type(upper)
     h = (upper-lower)/m
     nodes = np.linspace(lower, upper, (n-1)*m + 1)
-    vandermonde = np.stack(np.linspace(-1,1,n)**k for k in range(n))
-    integrals = np.zeros(n)
-    integrals[::2] = [1/(k+1) for k in range(0,n,2)]
-    subinterval_weights = np.linalg.solve(vandermonde, integrals)
-    weights = np.zeros((n-1)*m + 1)
+    points = np.linspace(work.type(-1), work.type(1), n)
+    vandermonde = np.stack([points**k for k in range(n)])
+    integrals = np.zeros(n, dtype=work)
+    integrals[::2] = 1/np.arange(1, n+1, 2, dtype=work)
+    # LAPACK only works in double precision, so extended-precision weights
+    # are obtained by iterative refinement with residuals in `work`.
+    subinterval_weights = np.linalg.solve(vandermonde.astype(float),
+                                          integrals.astype(float)).astype(work)
+    if precision.extended(work):
+        residual = integrals - vandermonde @ subinterval_weights
+        subinterval_weights += np.linalg.solve(vandermonde.astype(float),
+                                               residual.astype(float))
+    weights = np.zeros((n-1)*m + 1, dtype=work)
     for i in range(m):
         weights[i*(n-1) : (i+1)*(n-1) + 1] += subinterval_weights*h
-    return nodes, weights
+    return precision.cast((nodes, weights), dtype)
     
 
-def composite_gauss(m, n, lower=-1, upper=1):
+def composite_gauss(m, n, lower=-1, upper=1, dtype=None):
     '''
     Composite Gauss rules:
     
     Composite rules of order 2*n-1 using Gauss-Legendre quadrature
     on each subinterval. The total number of evaluation points is n*m.
     '''
-    h = (upper-lower)/m
-    subinterval_nodes, subinterval_weights = gauss_legendre(n)
-    nodes = (h/2*np.tile(subinterval_nodes, m)
-             + np.repeat(np.linspace(lower + h/2, upper - h/2, m), n))
-    weights = np.tile(subinterval_weights*h/2, m)
-    return nodes, weights
+    work = precision.working(dtype)
+    subinterval_nodes, subinterval_weights = cache.cached_rule(
+        gauss_legendre, n, -1, 1, work, dtype=work)
+    edges = np.linspace(work.type(lower), work.type(upper), m+1)
+    nodes, weights = affine(subinterval_nodes, subinterval_weights,
+                            edges[:-1], edges[1:])
+    return precision.cast((nodes.ravel(), weights.ravel()), dtype)
     
@@ -0,0 +1,136 @@
+import numpy as np
+from numpy import pi, sqrt
+from cubit.integrate import integrate
+
+def rank1(z, n, lower=-1, upper=1, shift=None):
+    '''
+    Rank-1 lattice rule:
+    
+    The rule with the n equally weighted points frac(i*z/n), i = 0, ..., n-1,
+    for the generating vector z (of length d), mapped from [0, 1)**d onto
+    the box [lower, upper]**d. `shift`, if given, is a vector in [0, 1)**d
+    added to every point modulo 1 before the mapping. With d = 1 this is
+    the trapezoid rule, and in general these rules are very effective for
+    smooth integrands periodic on the box.
+    
+    `lower` and `upper` may be scalars or arrays of length d.
+    Returns a tuple of d coordinate arrays and an array of weights.
+    
+    Sloan, I. H., and Joe, S., "Lattice Methods for Multiple Integration",
+    Oxford University Press, 1994.
+    '''
+    z = np.asarray(z, dtype=np.int64)
+    d = len(z)
+    points = (np.arange(n, dtype=np.int64)[:,np.newaxis]*z % n)/n
+    if shift is not None:
+        points = (points + shift) % 1
+    lower = np.broadcast_to(lower, d).astype(float)
+    upper = np.broadcast_to(upper, d).astype(float)
+    nodes = lower + (upper - lower)*points
+    weights = np.full(n, np.prod(upper - lower)/n)
+    return tuple(nodes.T), weights
+
+def fibonacci(k, lower=-1, upper=1, shift=None):
+    '''
+    Fibonacci lattice rule:
+    
+    The two-dimensional rank-1 lattice rule with n = F_k points and
+    generating vector (1, F_{k-1}), where F_k is the k-th Fibonacci number
+    (F_1 = F_2 = 1). These are the optimal lattices in two dimensions.
+    See `rank1` for the other arguments.
+    '''
+    previous, n = 0, 1
+    for _ in range(k - 1):
+        previous, n = n, previous + n
+    return rank1([1, previous], n, lower, upper, shift)
+
+def omega(x):
+    '''
+    The kernel ω(x) = 2π² B_2(x) of the weighted Korobov space of
+    periodic functions with square-integrable mixed first derivatives,
+    in terms of the Bernoulli polynomial B_2(x) = x**2 - x + 1/6.
+    '''
+    return 2*pi**2*(x**2 - x + 1/6)
+
+def worst_case_error(z, n, gammas=1):
+    '''
+    The worst-case error of the rank-1 lattice rule with generating vector
+    z and n points in the Korobov space with product weights `gammas`
+    (a scalar, or one weight for each dimension).
+    '''
+    z = np.asarray(z, dtype=np.int64)
+    gammas = np.broadcast_to(gammas, len(z))
+    k = np.arange(n, dtype=np.int64)
+    product = np.ones(n)
+    for zj, gamma in zip(z, gammas):
+        product *= 1 + gamma*omega(k*zj % n/n)
+    return sqrt(max(np.mean(product) - 1, 0))
+
+def cbc(n, d, gammas=1):
+    '''
+    Fast component-by-component construction of a generating vector
+    for a rank-1 lattice rule with a prime number n of points.
+    
+    Each component is chosen in turn to minimize the worst-case error
+    (see `worst_case_error`) given the ones before. Ordering the candidates
+    and the points by powers of a primitive root g modulo n turns the
+    errors for all n - 1 candidates into a cyclic correlation, which is
+    computed with FFTs, so the whole construction takes O(d n log n)
+    operations rather than O(d n**2).
+    
+    Nuyens, D., and Cools, R., "Fast algorithms for component-by-component
+    construction of rank-1 lattice rules in shift-invariant reproducing
+    kernel Hilbert spaces", Math. Comp., v. 75, 2006, pp. 903-920.
+    '''
+    if n < 3 or any(n % p == 0 for p in range(2, int(sqrt(n)) + 1)):
+        raise ValueError('the number of points must be an odd prime')
+    gammas = np.broadcast_to(gammas, d)
+    g = _primitive_root(n)
+    powers = np.empty(n - 1, dtype=np.int64)
+    powers[0] = 1
+    for j in range(1, n - 1):
+        powers[j] = powers[j-1]*g % n
+    kernel = np.fft.fft(omega(powers/n))
+    k = np.arange(n, dtype=np.int64)
+    product = np.ones(n)
+    z = np.empty(d, dtype=np.int64)
+    for j, gamma in enumerate(gammas):
+        if j == 0:
+            z[j] = 1
+        else:
+            # errors[b] = Σ_a product[g**a] ω(g**(a+b)/n), up to constants
+            errors = np.fft.ifft(np.conj(np.fft.fft(product[powers]))*kernel).real
+            z[j] = powers[np.argmin(errors)]
+        product *= 1 + gamma*omega(k*z[j] % n/n)
+    return z
+
+def _primitive_root(n):
+    # The smallest generator of the multiplicative group modulo a prime n
+    factors = []
+    m = n - 1
+    for p in range(2, int(sqrt(m)) + 1):
+        if m % p == 0:
+            factors.append(p)
+            while m % p == 0:
+                m //= p
+    if m > 1:
+        factors.append(m)
+    for g in range(2, n):
+        if all(pow(g, (n - 1)//p, n) != 1 for p in factors):
+            return g
+
+def estimate(f, z, n, replicates=16, lower=-1, upper=1, seed=None):
+    '''
+    Integrate `f` with `replicates` copies of the rank-1 lattice rule with
+    generating vector z and n points, each with an independent uniformly
+    random shift.
+    
+    Returns a tuple of the mean of the estimates, its standard error,
+    and the number of integrand evaluations.
+    '''
+    rng = np.random.default_rng(seed)
+    values = np.array([integrate(f, rank1(z, n, lower, upper, shift))
+                       for shift in rng.random((replicates, len(z)))])
+    mean = np.mean(values, axis=0)
+    error = np.std(values, axis=0, ddof=1)/sqrt(replicates)
+    return mean, error, replicates*n
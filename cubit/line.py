@@ -1,32 +1,48 @@
 import numpy as np
 from scipy import special
+from cubit import precision
 
-def gauss_hermite(n):
+def gauss_hermite(n, dtype=None):
     '''
     Gauss-Hermite quadrature:
     
     A rule of order 2*n-1 on the line with respect to
     the weight function w(x) = exp(-x**2).
+    `dtype` may be float32, float64 (the default) or longdouble; longdouble
+    rules are refined by Newton's method in longdouble arithmetic.
     '''
-    return special.roots_hermite(n)
+    nodes, weights = special.roots_hermite(n)
+    if precision.extended(dtype):
+        k = np.arange(1, n, dtype=dtype)
+        mu0 = np.sqrt(precision.pi(dtype))
+        nodes, weights = precision.gauss(np.zeros(n), np.sqrt(k/2), mu0,
+                                         nodes, dtype)
+    return precision.cast((nodes, weights), dtype)
 
-def gauss_hermite_e(n):
+def gauss_hermite_e(n, dtype=None):
     '''
     Gauss-Hermite quadrature:
     
     A rule of order 2*n-1 on the line with respect to
     the weight function w(x) = exp(-x**2/2).
     '''
-    return special.roots_hermitenorm(n)
+    nodes, weights = special.roots_hermitenorm(n)
+    if precision.extended(dtype):
+        k = np.arange(1, n, dtype=dtype)
+        mu0 = np.sqrt(2*precision.pi(dtype))
+        nodes, weights = precision.gauss(np.zeros(n), np.sqrt(k), mu0,
+                                         nodes, dtype)
+    return precision.cast((nodes, weights), dtype)
 
-def normal(n, loc=0, scale=1):
+def normal(n, loc=0, scale=1, dtype=None):
     '''
     Gauss-Hermite quadrature:
     
     A rule of order 2*n-1 on the line with respect to the PDF of a
     normal distribution with arbitrary location and scale.
     '''
-    nodes, weights = special.roots_hermitenorm(n)
+    work = precision.working(dtype)
+    nodes, weights = gauss_hermite_e(n, dtype=work)
     nodes = loc + scale*nodes
-    weights = weights/np.sqrt(2*np.pi)
-    return nodes, weights
+    weights = weights/np.sqrt(2*precision.pi(work))
+    return precision.cast((nodes, weights), dtype)
@@ -1,11 +1,25 @@
+import numpy as np
 import sympy as sym
+from mpmath import mp
+from scipy import linalg
 
 x = sym.Symbol('x')
 
 class weight_fn:
+    '''
+    A weight function given by its moments: `momfunc(k)` returns the k-th
+    moment ∫ x**k w(x) dx.
+    
+    The moments should be exact (integers, or sympy rationals or
+    expressions) or mpmath numbers at high precision. Recovering the
+    recurrence coefficients from ordinary moments is ill-conditioned, so
+    moments rounded to Python floats stop describing a positive weight
+    function from about n = 15, and `recurrence` raises a ValueError.
+    '''
     def __init__(self, momfunc):
         self.moment = momfunc
         self._cache = dict()
+        self._moments = dict()
     
     def inner(self, p1, p2):
         prod = sym.Poly(p1*p2, x)
@@ -34,3 +48,103 @@ class weight_fn:
                 poly = (x - alpha)*oneprev - beta*twoprev
                 self._cache[n] = sym.expand(poly)
             return self._cache[n]
+    
+    def numeric_moment(self, k):
+        '''
+        The k-th moment as an mpmath number at the current precision.
+        '''
+        key = (k, mp.prec)
+        try:
+            return self._moments[key]
+        except KeyError:
+            self._moments[key] = _to_mpf(self.moment(k))
+            return self._moments[key]
+    
+    def recurrence(self, n, dps=None):
+        '''
+        Compute the first n recurrence coefficients alpha_k, beta_k of the
+        monic orthogonal polynomials,
+            p_{k+1}(x) = (x - alpha_k) p_k(x) - beta_k p_{k-1}(x),
+        numerically from the moments 0, ..., 2n-1, by Chebyshev's algorithm.
+        Unlike `orthopoly`, this involves no symbolic algebra.
+        
+        Computing recurrence coefficients from ordinary moments is
+        ill-conditioned, losing up to about two digits per degree, so the
+        work is done in mpmath with 2*n + 5 guard digits on top of `dps`
+        (or double precision). If `dps` is given, lists of mpmath numbers
+        are returned; otherwise, float arrays. Raises a ValueError if any
+        beta_k is not positive, as for inaccurate moments.
+        '''
+        with mp.workdps((15 if dps is None else dps) + 2*n + 5):
+            moments = [self.numeric_moment(k) for k in range(2*n)]
+            alpha, beta = chebyshev(moments)
+            for k, b in enumerate(beta):
+                if not b > 0:
+                    raise ValueError(
+                        f'beta_{k} = {mp.nstr(b, 5)} is not positive: the moments '
+                        f'up to {2*n - 1} do not define a positive weight function. '
+                        f'Give them exactly or at high precision, not as floats.')
+        if dps is None:
+            return np.array(alpha, dtype=float), np.array(beta, dtype=float)
+        with mp.workdps(dps):
+            return [+a for a in alpha], [+b for b in beta]
+    
+    def gauss(self, n, dps=None):
+        '''
+        Compute the n-point Gauss rule for this weight function.
+        
+        Without `dps`, returns float arrays of nodes and weights, solving the
+        Golub-Welsch eigenvalue problem with LAPACK. With `dps`, returns
+        mpmath matrices computed by `golub_welsch.gauss` at that precision.
+        '''
+        alpha, beta = self.recurrence(n)
+        nodes, vectors = linalg.eigh_tridiagonal(alpha, np.sqrt(beta[1:]))
+        if dps is None:
+            return nodes, beta[0]*vectors[0]**2
+        from cubit import golub_welsch
+        with mp.workdps(dps):
+            alpha, beta = self.recurrence(n, dps=dps)
+            return golub_welsch.gauss(alpha, [mp.sqrt(b) for b in beta[1:]],
+                                      beta[0], nodes)
+
+def chebyshev(moments, a=None, b=None):
+    '''
+    Modified Chebyshev algorithm:
+    
+    Compute the recurrence coefficients alpha_k, beta_k (k < n) of the monic
+    polynomials orthogonal with respect to a weight function from its 2n
+    modified moments m_l = ∫ q_l(x) w(x) dx, where the reference polynomials
+    q_l satisfy q_{l+1}(x) = (x - a_l) q_l(x) - b_l q_{l-1}(x).
+    Without `a` and `b`, q_l(x) = x**l and these are the ordinary moments.
+    Works with floats or mpmath numbers alike; beta_0 is the zeroth moment.
+    
+    Gautschi, W., "Orthogonal Polynomials: Computation and Approximation",
+    Oxford University Press, 2004, §2.1.7.
+    '''
+    n = len(moments)//2
+    moments = np.array(moments, dtype=object)
+    if a is None:
+        a = np.zeros(2*n, dtype=object)
+    if b is None:
+        b = np.zeros(2*n, dtype=object)
+    a = np.array(a, dtype=object)
+    b = np.array(b, dtype=object)
+    alpha = [a[0] + moments[1]/moments[0]]
+    beta = [moments[0]]
+    # sigma[l] holds σ_{k,l}; only σ_{k,l} for k <= l < 2n-k are needed.
+    sigma_prev = np.zeros(2*n, dtype=object)
+    sigma = moments.copy()
+    for k in range(1, n):
+        l = np.arange(k, 2*n - k)
+        sigma_next = np.zeros(2*n, dtype=object)
+        sigma_next[l] = (sigma[l+1] - (alpha[k-1] - a[l])*sigma[l]
+                         - beta[k-1]*sigma_prev[l] + b[l]*sigma[l-1])
+        alpha.append(a[k] + sigma_next[k+1]/sigma_next[k] - sigma[k]/sigma[k-1])
+        beta.append(sigma_next[k]/sigma[k-1])
+        sigma_prev, sigma = sigma, sigma_next
+    return alpha, beta
+
+def _to_mpf(value):
+    if isinstance(value, sym.Basic):
+        return mp.mpf(str(sym.N(value, mp.dps + 10)))
+    return mp.mpf(value)
@@ -0,0 +1,125 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from cubit.integrate import unpack, evaluate, contract, node_axis
+
+executors = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+
+def chunks(n, chunksize):
+    '''
+    The (start, stop) bounds of the chunks of a rule with n nodes.
+    They depend only on n and `chunksize`, never on the number of workers.
+    '''
+    return [(start, min(start + chunksize, n)) for start in range(0, n, chunksize)]
+
+def integrate(f, rule, executor='thread', workers=None, chunksize=2**14):
+    '''
+    Integrate `f` using a cubature rule, evaluating chunks of `chunksize`
+    nodes concurrently.
+    
+    `executor` is 'thread' or 'process', to run on a new pool of `workers`
+    threads or processes, or an existing `concurrent.futures` executor.
+    Threads suit integrands that release the GIL (most numpy code does);
+    processes suit pure-Python integrands, which must then be picklable
+    (defined at the top level of a module). Process workers read the
+    nodes and weights from a shared memory block rather than receiving
+    pickled copies, and send back only their partial sums.
+    
+    The partial sums are added in chunk order once all are complete, so
+    the result is bit-for-bit the same for any number of workers, and
+    the same as `integrate.integrate(f, rule, chunksize)`.
+    '''
+    nodes, weights = unpack(rule)
+    if isinstance(executor, str):
+        with executors[executor](max_workers=workers) as pool:
+            return integrate(f, (nodes, weights), pool, chunksize=chunksize)
+    bounds = chunks(len(weights), chunksize)
+    if isinstance(executor, ProcessPoolExecutor):
+        partials = _map_shared(executor, f, nodes, weights, bounds)
+    else:
+        futures = [executor.submit(_partial, f, nodes, weights, start, stop)
+                   for start, stop in bounds]
+        partials = [future.result() for future in futures]
+    total = 0
+    for partial in partials:
+        total = total + partial
+    return total
+
+def _partial(f, nodes, weights, start, stop):
+    chunk = slice(start, stop)
+    values = evaluate(f, tuple(coord[chunk] for coord in nodes))
+    return contract(values, weights[chunk])
+
+def _map_shared(executor, f, nodes, weights, bounds):
+    # Copy the nodes and weights, as the rows of one array, into a shared
+    # memory block, and have each task attach to it by name.
+    data = np.stack(nodes + (weights,))
+    block = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    try:
+        np.ndarray(data.shape, data.dtype, buffer=block.buf)[:] = data
+        futures = [executor.submit(_shared_partial, f, block.name, data.shape,
+                                   data.dtype.str, start, stop)
+                   for start, stop in bounds]
+        return [future.result() for future in futures]
+    finally:
+        block.close()
+        block.unlink()
+
+def _shared_partial(f, name, shape, dtype, start, stop):
+    block = shared_memory.SharedMemory(name=name)
+    data = np.ndarray(shape, dtype, buffer=block.buf)
+    try:
+        return _partial(f, tuple(data[:-1]), data[-1], start, stop)
+    finally:
+        # The block can only be closed once no arrays refer to it.
+        del data
+        block.close()
+
+async def integrate_async(f, rule, concurrency=16, batch=None):
+    '''
+    Integrate a coroutine function `f` using a cubature rule, for
+    integrands that are I/O-bound, such as requests to a service.
+    
+    With `batch` None, `f` is awaited once per node with scalar
+    coordinates, `await f(x, y)`, and should return a scalar or array.
+    Otherwise it is awaited once per batch of up to `batch` nodes with
+    coordinate arrays, and should return values with the nodes along the
+    last axis, as in `integrate.integrate`.
+    
+    At most `concurrency` calls are in flight at once. Each result is
+    weighted and added to the total as soon as it arrives, so only the
+    running sum is kept; the order of the additions, and hence the last
+    bits of the result, depends on the order in which calls complete.
+    If a call raises an exception, the calls still in flight are
+    cancelled and the exception is propagated.
+    
+    For example, `asyncio.run(integrate_async(f, square.prod_gauss(10, 10)))`.
+    '''
+    nodes, weights = unpack(rule)
+    bounds = iter(chunks(len(weights), 1 if batch is None else batch))
+    total = 0
+    
+    async def worker():
+        nonlocal total
+        # The workers share one iterator, so each batch is taken only once.
+        for start, stop in bounds:
+            if batch is None:
+                value = np.asarray(await f(*(coord[start] for coord in nodes)))
+                total = total + value*weights[start]
+            else:
+                values = await f(*(coord[start:stop] for coord in nodes))
+                total = total + contract(node_axis(values, stop - start),
+                                         weights[start:stop])
+    
+    tasks = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return total
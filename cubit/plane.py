@@ -1,9 +1,8 @@
 import numpy as np
 from numpy import pi, sin, cos, exp, log, sqrt
-from scipy import special
-from cubit import line, ray
+from cubit import line, precision, ray, tensor
 
-def sphprod_gauss(n):
+def sphprod_gauss(n, dtype=None):
     '''
     Spherical product Gauss rule:
     
@@ -13,20 +12,20 @@ def sphprod_gauss(n):
     n*(n-1) of them lying on (n-1)/2 regular 2n-gons and one lying at
     the origin. 
     '''
-    theta = np.linspace(-(1-1/(2*n))*pi, (1-1/(2*n))*pi, 2*n)
+    work = precision.working(dtype)
+    pi = precision.pi(work)
+    theta = np.arange(1 - 2*n, 2*n, 2, dtype=work)*pi/(2*n)
     theta_weights = np.full(2*n, pi/n)
     
     if n % 2 == 1:
-        rsquared = ray.gauss_genlaguerre(n//2, 1)[0]
+        rsquared = ray.gauss_genlaguerre(n//2, 1, dtype=work)[0]
         r = sqrt(rsquared)
-        even_orders = np.arange(0,(n+1)//2)
-        rsquared = np.concatenate((np.zeros(1), rsquared))
-        rsquared = rsquared[:,np.newaxis]
-        evens = special.eval_laguerre(even_orders, rsquared)**2
+        rsquared = np.concatenate((np.zeros(1, dtype=work), rsquared))
+        evens = _laguerre((n+1)//2, 0, rsquared)**2
         evens = np.sum(evens, axis = 1)
         odd_orders = np.arange(0,(n-1)//2)
-        odds = special.eval_genlaguerre(odd_orders, 1, rsquared)**2
-        odds = np.sum(rsquared/(odd_orders + 1)*odds, axis = 1)
+        odds = _laguerre((n-1)//2, 1, rsquared)**2
+        odds = np.sum(rsquared[:,np.newaxis]/(odd_orders + 1)*odds, axis = 1)
         r_weights = 1/(evens + odds)
         x_nodes = np.tile(r, 2*n)*np.repeat(cos(theta), n//2)
         x_nodes = np.concatenate((np.zeros(1), x_nodes))
@@ -35,29 +34,39 @@ def sphprod_gauss(n):
         weights = np.tile(r_weights[1:], 2*n)*np.repeat(theta_weights, n//2)
         weights = np.concatenate((pi*r_weights[0:1], weights))
     else:
-        rsquared, rsquared_weights = ray.gauss_laguerre(n//2)
+        rsquared, rsquared_weights = ray.gauss_laguerre(n//2, dtype=work)
         r = sqrt(rsquared)
         r_weights = rsquared_weights/2
         x_nodes = np.tile(r, 2*n)*np.repeat(cos(theta), n//2)
         y_nodes = np.tile(r, 2*n)*np.repeat(sin(theta), n//2)
         weights = np.tile(r_weights, 2*n)*np.repeat(theta_weights, n//2)
     
-    return (x_nodes, y_nodes), weights
+    return precision.cast(((x_nodes, y_nodes), weights), dtype)
+
+def _laguerre(m, alpha, x):
+    # The generalized Laguerre polynomials L_k^(alpha)(x), k = 0, ..., m-1,
+    # as the columns of an array, in the precision of x
+    values = np.empty(x.shape + (m,), dtype=x.dtype)
+    prev, cur = np.zeros_like(x), np.ones_like(x)
+    for k in range(m):
+        values[..., k] = cur
+        prev, cur = cur, ((2*k + 1 + alpha - x)*cur - (k + alpha)*prev)/(k + 1)
+    return values
 
-def prod_hermgauss(n1, n2):
+def prod_hermgauss(n1, n2, lazy=False, dtype=None):
     '''
     Product Gauss-Hermite rule:
     
     The product form of a Gauss-Hermite quadrature rule.
     If n1 == n2 == n, this is a rule of order 2*n-1, using n**2 points.
+    If `lazy` is true, the rule is returned as a `tensor.TensorRule`.
     '''
-    nodes1, weights1 = line.hermgauss(n1)
-    nodes2, weights2 = line.hermgauss(n2)
-    x_nodes = np.tile(nodes1, n2)
-    y_nodes = np.repeat(nodes2, n1)
-    weights = np.tile(weights1, n2) * np.repeat(weights2, n1)
-    return (x_nodes, y_nodes), weights
+    work = precision.working(dtype)
+    rule = tensor.product(line.gauss_hermite(n1, dtype=work),
+                          line.gauss_hermite(n2, dtype=work))
+    return precision.cast(rule if lazy else rule.materialize(), dtype)
 
+@precision.with_dtype
 def pentagon():
     '''
     Pentagonal rule (Stroud Er22: 4-1):
@@ -75,6 +84,7 @@ def pentagon():
     weights *= pi
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def hexagon():
     '''
     Hexagonal rule (Stroud Er22: 5-1):
@@ -96,6 +106,7 @@ def hexagon():
     weights *= pi
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def ss_12pt():
     '''
     Stroud-Secrest twelve-point rule (Stroud Er22: 7-1):
@@ -121,6 +132,7 @@ def ss_12pt():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def rr_20pt():
     '''
     Rabinowitz-Richter 20-point rule (Stroud Er22: 9-1):
@@ -151,6 +163,7 @@ def rr_20pt():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def rr_28pt():
     '''
     First Rabinowitz-Richter 28-point rule (Stroud Er22: 11-1):
@@ -190,6 +203,7 @@ def rr_28pt():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def rr_28pt2():
     '''
     Second Rabinowitz-Richter 28-point rule (Stroud Er22: 11-2):
@@ -230,6 +244,7 @@ def rr_28pt2():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def rr_37pt():
     '''
     Rabinowitz-Richter 37-point rule (Stroud Er22: 13-1):
@@ -274,6 +289,7 @@ def rr_37pt():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def rr_44pt():
     '''
     Rabinowitz-Richter 44-point rule (Stroud Er22: 15-1):
@@ -0,0 +1,129 @@
+import inspect
+from functools import wraps
+import numpy as np
+from mpmath import mp
+
+def working(dtype):
+    '''
+    The dtype in which a rule requested in `dtype` is computed: `dtype`
+    itself if it is at least as precise as float64, and float64 otherwise,
+    so that float32 rules are only rounded once, at the end.
+    '''
+    return np.result_type(np.float64 if dtype is None else dtype, np.float64)
+
+def extended(dtype):
+    '''
+    Whether `dtype` carries more precision than float64 (longdouble
+    on most x86 platforms), so that double-precision rules need to be
+    refined before they are converted to it.
+    '''
+    return dtype is not None and np.finfo(dtype).eps < np.finfo(np.float64).eps
+
+def pi(dtype):
+    '''
+    π rounded to the given dtype.
+    '''
+    return 4*np.arctan(np.ones((), dtype=working(dtype)))
+
+def evaluate(func, *args, dtype):
+    '''
+    Evaluate `func(*args)` with mpmath, in about three times the precision
+    of `dtype`, and round the result to `dtype`. The arguments (scalars in
+    `dtype` or float64) are converted to mpmath exactly. This is used for
+    the integrals of weight functions, which need special functions that
+    numpy and scipy only provide in double precision.
+    '''
+    work = working(dtype)
+    with mp.workprec(3*(np.finfo(work).nmant + 1)):
+        result = func(*(_to_mpf(arg, work) for arg in args))
+        return work.type(mp.nstr(result, np.finfo(work).precision + 10))
+
+def _to_mpf(x, work):
+    # A float64 or longdouble value as the exact sum of two doubles
+    x = np.asarray(x, dtype=work)
+    high = float(x)
+    return mp.mpf(high) + mp.mpf(float(x - high))
+
+def gamma(x, dtype):
+    '''
+    The gamma function in the working precision of `dtype`, for x > 0,
+    computed with mpmath, as scipy only provides it in double precision.
+    '''
+    return evaluate(mp.gamma, x, dtype=dtype)
+
+def cast(rule, dtype):
+    '''
+    Convert every array in a (possibly nested) rule tuple, or in the
+    factors of a `tensor.TensorRule`, to the given dtype. A dtype of None
+    leaves the rule unchanged.
+    '''
+    if dtype is None:
+        return rule
+    if hasattr(rule, 'factors'):
+        return type(rule)(cast(rule.factors, dtype))
+    if isinstance(rule, (tuple, list)):
+        return tuple(cast(part, dtype) for part in rule)
+    return np.asarray(rule, dtype=dtype)
+
+def with_dtype(func):
+    '''
+    Give a rule constructor a `dtype` keyword argument, converting the
+    rule it returns (computed in double precision) to that dtype.
+    
+    This is used for the tabulated rules, whose nodes and weights are
+    stored as double-precision constants: they can be had in float32 to
+    save memory, but a longdouble rule is no more accurate than float64.
+    '''
+    @wraps(func)
+    def wrapper(*args, dtype=None, **kwargs):
+        return cast(func(*args, **kwargs), dtype)
+    
+    # Show the dtype keyword in inspect.signature and help(), which would
+    # otherwise follow __wrapped__ to the signature of func.
+    signature = inspect.signature(func)
+    parameters = list(signature.parameters.values())
+    dtype = inspect.Parameter('dtype', inspect.Parameter.KEYWORD_ONLY, default=None)
+    if parameters and parameters[-1].kind == inspect.Parameter.VAR_KEYWORD:
+        parameters.insert(-1, dtype)
+    else:
+        parameters.append(dtype)
+    wrapper.__signature__ = signature.replace(parameters=parameters)
+    return wrapper
+
+def gauss(d, e, mu0, seeds, dtype, iterations=4):
+    '''
+    Refine a Gauss rule in the precision of `dtype`.
+    
+    `d` and `e` are the diagonal and off-diagonal of the Jacobi matrix
+    of the weight function and `mu0` is its integral, which should be
+    computed in `dtype` arithmetic, and `seeds` are the nodes computed in
+    double precision.
+    A few steps of Newton's method on the orthonormal three-term
+    recurrence, evaluated at all nodes at once, bring the nodes to full
+    accuracy in `dtype`, and the weights are then 1/Σ p_k(x)**2.
+    This takes O(n**2) operations per step.
+    '''
+    d, e, mu0 = (np.asarray(a, dtype=dtype) for a in (d, e, mu0))
+    x = np.array(seeds, dtype=dtype)
+    for _ in range(iterations):
+        p, _, dp = _recurrence(d, e, mu0, x)
+        x -= p/dp
+    _, squares, _ = _recurrence(d, e, mu0, x)
+    return x, 1/squares
+
+def _recurrence(d, e, mu0, x):
+    # p_n(x) and its derivative (up to a common factor), and Σ_{k<n} p_k(x)**2
+    p_prev = np.zeros_like(x)
+    dp_prev = np.zeros_like(x)
+    p = np.full_like(x, 1/np.sqrt(mu0))
+    dp = np.zeros_like(x)
+    squares = p**2
+    for k in range(len(d)):
+        scale = e[k] if k < len(e) else 1
+        back = e[k-1] if k > 0 else 0
+        p_next = ((x - d[k])*p - back*p_prev)/scale
+        dp_next = ((x - d[k])*dp + p - back*dp_prev)/scale
+        p_prev, p, dp_prev, dp = p, p_next, dp, dp_next
+        if k < len(e):
+            squares += p**2
+    return p, squares, dp
@@ -0,0 +1,97 @@
+import numpy as np
+from cubit import interval
+from cubit.integrate import evaluate, contract
+from cubit.sparse import levels
+
+class Progressive:
+    '''
+    Progressive integration of `f` over [lower, upper] with a nested
+    sequence of rules.
+    
+    `rule` is either the name of one of the sequences in `sparse.levels`
+    or a function taking the level and returning nodes and weights on
+    [-1, 1]. Each call of `refine` moves to the next level, calling `f`
+    only at the nodes that were not already nodes of the level before;
+    the values at the others are carried over. `values` is kept aligned
+    with `nodes`, with the nodes along its last axis, as in
+    `integrate.evaluate`. Nodes are matched to within `tol`.
+    
+    Sequences that are not nested, such as 'gauss_legendre', can also
+    be used, but then few values (if any) are reused.
+    '''
+    def __init__(self, f, rule='clenshaw_curtis', lower=-1, upper=1, tol=1e-12):
+        self.f = f
+        self.rule = levels[rule] if isinstance(rule, str) else rule
+        self.lower = lower
+        self.upper = upper
+        self.tol = tol
+        self.level = 0
+        self.nodes = np.zeros(0)
+        self.values = None
+        self.estimate = None
+        self.neval = 0
+    
+    def refine(self):
+        '''
+        Move to the next level and return its estimate of the integral.
+        '''
+        self.level += 1
+        nodes, weights = self.rule(self.level)
+        index = _match(nodes, self.nodes, self.tol)
+        new = index < 0
+        x, w = interval.affine(nodes, weights, self.lower, self.upper)
+        fresh = evaluate(self.f, (x[new],))
+        shape = fresh.shape[:-1] + (len(nodes),)
+        if self.values is None:
+            values = np.empty(shape, dtype=fresh.dtype)
+        else:
+            values = np.empty(shape, dtype=np.result_type(fresh, self.values))
+            values[..., ~new] = self.values[..., index[~new]]
+        values[..., new] = fresh
+        self.nodes, self.values = nodes, values
+        self.neval += int(np.count_nonzero(new))
+        self.estimate = contract(values, w)[()]
+        return self.estimate
+
+def _match(nodes, old, tol):
+    # For each node, the index of the old node it coincides with, or -1
+    index = np.full(len(nodes), -1)
+    if len(old) == 0:
+        return index
+    order = np.argsort(old)
+    position = np.searchsorted(old[order], nodes)
+    left = order[np.clip(position - 1, 0, len(old) - 1)]
+    right = order[np.clip(position, 0, len(old) - 1)]
+    nearest = np.where(np.abs(old[left] - nodes) < np.abs(old[right] - nodes),
+                       left, right)
+    matched = np.abs(old[nearest] - nodes) <= tol
+    index[matched] = nearest[matched]
+    return index
+
+def integrate(f, rule='clenshaw_curtis', lower=-1, upper=1, atol=1e-10,
+              rtol=1e-10, min_level=3, max_level=20):
+    '''
+    Progressive integration on [lower, upper] with a nested sequence of
+    rules (see `Progressive`):
+    
+    Levels are added one at a time, each evaluating `f` only at its new
+    nodes, until two successive estimates (from `min_level` on) differ by
+    at most max(atol, rtol*|value|), or `max_level` is reached. For nested
+    sequences such as trapezoid doubling or Clenshaw-Curtis, this costs
+    about half as many evaluations as computing every level from scratch.
+    
+    Returns a tuple of the integral estimate (a float for a scalar
+    integrand), the error estimate (the difference between the last two
+    estimates), and the number of integrand evaluations.
+    '''
+    progressive = Progressive(f, rule, lower, upper)
+    previous = progressive.refine()
+    error = np.inf
+    while progressive.level < max_level:
+        value = progressive.refine()
+        error = np.max(np.abs(value - previous))
+        if (progressive.level >= min_level
+            and error <= max(atol, rtol*np.max(np.abs(value)))):
+            break
+        previous = value
+    return progressive.estimate, error, progressive.neval
@@ -0,0 +1,172 @@
+from functools import partial
+import numpy as np
+from numpy import pi, sin, cos, sqrt
+from scipy.stats import qmc as sequences
+from cubit.triangle import areas, from_barycentric
+from cubit.integrate import evaluate, contract
+
+engines = {
+    'sobol': sequences.Sobol,
+    'halton': sequences.Halton,
+}
+
+class QMCRule:
+    '''
+    A randomized quasi-Monte Carlo rule with n equally weighted points,
+    generated on demand in blocks so that the memory needed is bounded by
+    the block size, in the manner of `tensor.TensorRule`.
+    
+    Points of a scrambled Sobol or Halton sequence (`sequence`), optionally
+    given a random shift modulo 1 (Cranley-Patterson rotation), are drawn
+    in the unit cube [0, 1)**d and mapped onto the region by `transform`,
+    which is area-preserving, so every weight is `measure/n`. The blocks
+    are consecutive pieces of one sequence, so they make up exactly the
+    rule given by `materialize`. The randomization is determined by
+    `seed`, so blocks can be regenerated, and `replicates` gives
+    independently randomized copies for error estimates.
+    
+    Sobol points are best used with n and the block size powers of 2.
+    '''
+    def __init__(self, n, d, transform, measure, sequence='sobol',
+                 scramble=True, shift=False, seed=None):
+        self.n = n
+        self.d = d
+        self.transform = transform
+        self.measure = measure
+        self.sequence = sequence
+        self.scramble = scramble
+        self.shift = shift
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed = seed
+        self._engine_seed, shift_seed = seed.spawn(2)
+        self._offset = np.random.default_rng(shift_seed).random(d) if shift else None
+    
+    def __len__(self):
+        return self.n
+    
+    def blocks(self, size=2**16):
+        '''
+        Yield the nodes and weights in blocks of at most `size` points.
+        '''
+        # An integer seed, as scipy may spawn from the seed sequence of
+        # a generator, which would change the scrambling on every call.
+        seed = int(self._engine_seed.generate_state(1, np.uint64)[0])
+        engine = engines[self.sequence](self.d, scramble=self.scramble, seed=seed)
+        for start in range(0, self.n, size):
+            points = engine.random(min(size, self.n - start))
+            if self._offset is not None:
+                points = (points + self._offset) % 1
+            yield self.transform(points), np.full(len(points), self.measure/self.n)
+    
+    def materialize(self):
+        '''
+        Return all nodes and weights.
+        '''
+        return next(self.blocks(self.n))
+    
+    def integrate(self, f, size=2**16):
+        '''
+        Integrate `f`, called as `f(*nodes)` on one block of at most `size`
+        points at a time (see `integrate.integrate`).
+        '''
+        total = 0
+        for nodes, weights in self.blocks(size):
+            total = total + contract(evaluate(f, nodes), weights)
+        return total
+    
+    def replicates(self, count):
+        '''
+        Return `count` copies of the rule with independent randomizations.
+        '''
+        return [QMCRule(self.n, self.d, self.transform, self.measure,
+                        self.sequence, self.scramble, self.shift, seed)
+                for seed in self.seed.spawn(count)]
+
+def estimate(f, rule, replicates=16, size=2**16):
+    '''
+    Integrate `f` with independently randomized replicates of a `QMCRule`
+    (for example, `qmc.disk(2**12, lazy=True)`).
+    
+    Returns a tuple of the mean of the replicate estimates, its standard
+    error (which, for randomized QMC, is an unbiased error estimate), and
+    the number of integrand evaluations.
+    '''
+    values = np.array([replicate.integrate(f, size)
+                       for replicate in rule.replicates(replicates)])
+    mean = np.mean(values, axis=0)
+    error = np.std(values, axis=0, ddof=1)/sqrt(replicates)
+    return mean, error, replicates*len(rule)
+
+def _cube(points, lower, upper):
+    return tuple((lower + (upper - lower)*points).T)
+
+def _disk(points):
+    # Shirley and Chiu's concentric map, which maps squares about the
+    # center of the unit square onto circles and preserves area.
+    a, b = 2*points.T - 1
+    horizontal = np.abs(a) > np.abs(b)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = np.where(horizontal, a, b)
+        phi = np.where(horizontal, pi/4*b/a, pi/2 - pi/4*a/b)
+    phi = np.where(r == 0, 0, phi)
+    return r*cos(phi), r*sin(phi)
+
+def _triangle(points, vertices):
+    # Fold the unit square onto the triangle u + v <= 1 (this preserves
+    # area) and use the result as the last two barycentric coordinates.
+    u, v = points.T
+    fold = u + v > 1
+    u, v = np.where(fold, 1 - u, u), np.where(fold, 1 - v, v)
+    barycentric = np.stack((1 - u - v, u, v), axis=-1)
+    nodes, _ = from_barycentric(barycentric, np.ones(len(u)), vertices)
+    return tuple(nodes)
+
+def _rule(n, d, transform, measure, sequence, scramble, shift, seed, lazy):
+    rule = QMCRule(n, d, transform, measure, sequence, scramble, shift, seed)
+    return rule if lazy else rule.materialize()
+
+def cube(n, d, lower=-1, upper=1, sequence='sobol', scramble=True,
+         shift=False, seed=None, lazy=False):
+    '''
+    Randomized QMC rule on the box [lower, upper]**d with n points.
+    `lower` and `upper` may be scalars or arrays of length d.
+    Returns a tuple of d coordinate arrays and an array of weights, or
+    if `lazy` is true, a `QMCRule`.
+    
+    Owen, A. B., "Scrambling Sobol' and Niederreiter-Xing points",
+    J. Complexity, v. 14, 1998, pp. 466-489.
+    '''
+    lower = np.broadcast_to(lower, d).astype(float)
+    upper = np.broadcast_to(upper, d).astype(float)
+    transform = partial(_cube, lower=lower, upper=upper)
+    return _rule(n, d, transform, np.prod(upper - lower),
+                 sequence, scramble, shift, seed, lazy)
+
+def square(n, sequence='sobol', scramble=True, shift=False, seed=None, lazy=False):
+    '''
+    Randomized QMC rule on the square [-1, 1]**2 with n points (see `cube`).
+    '''
+    return cube(n, 2, -1, 1, sequence, scramble, shift, seed, lazy)
+
+def disk(n, sequence='sobol', scramble=True, shift=False, seed=None, lazy=False):
+    '''
+    Randomized QMC rule on the unit disk with n points, mapped from the
+    unit square by Shirley and Chiu's area-preserving concentric map.
+    
+    Shirley, P., and Chiu, K., "A low distortion map between disk and
+    square", J. Graphics Tools, v. 2, 1997, pp. 45-52.
+    '''
+    return _rule(n, 2, _disk, pi, sequence, scramble, shift, seed, lazy)
+
+def triangle(n, vertices, sequence='sobol', scramble=True, shift=False,
+             seed=None, lazy=False):
+    '''
+    Randomized QMC rule on the triangle with the given vertices (a 3×d
+    array, as in `triangle.radon_7pt`) with n points, mapped from the
+    unit square by folding it along its diagonal.
+    '''
+    vertices = np.asarray(vertices, dtype=float)
+    transform = partial(_triangle, vertices=vertices)
+    return _rule(n, 2, transform, areas(vertices), sequence, scramble,
+                 shift, seed, lazy)
@@ -1,46 +1,193 @@
 import numpy as np
 from numpy import pi, sin, cos, exp, log, sqrt
+from numpy.polynomial import polynomial
 from scipy import linalg, special
+from cubit import interval, precision
 
-def gauss_laguerre(n):
+def gauss_laguerre(n, dtype=None):
     '''
     Gauss-Laguerre quadrature:
     
     A rule of order 2*n-1 on the ray with respect to
     the weight function w(x) = exp(-x).
+    `dtype` may be float32, float64 (the default) or longdouble; longdouble
+    rules are refined by Newton's method in longdouble arithmetic.
     '''
-    return special.roots_laguerre(n)
+    if n > interval.asymptotic_threshold:
+        nodes, weights = gauss_laguerre_asy(n)
+    else:
+        nodes, weights = special.roots_laguerre(n)
+    if precision.extended(dtype):
+        k = np.arange(n, dtype=dtype)
+        nodes, weights = precision.gauss(2*k + 1, k[1:], 1, nodes, dtype)
+    return precision.cast((nodes, weights), dtype)
 
-def gauss_genlaguerre(n, alpha):
+def gauss_genlaguerre(n, alpha, dtype=None):
     '''
     Generalized Gauss-Laguerre quadrature:
     
     A rule of order 2*n-1 on the ray with respect to
     the weight function w(x) = x**alpha*exp(-x).
     '''
-    return special.roots_genlaguerre(n, alpha)
+    if (n > interval.asymptotic_threshold
+        and abs(alpha) <= interval.asymptotic_max_parameter):
+        nodes, weights = gauss_laguerre_asy(n, alpha)
+    else:
+        nodes, weights = special.roots_genlaguerre(n, alpha)
+    if precision.extended(dtype):
+        alpha = np.asarray(alpha, dtype=dtype)
+        k = np.arange(n, dtype=dtype)
+        e = sqrt(k[1:]*(k[1:] + alpha))
+        mu0 = precision.gamma(alpha + 1, dtype)
+        nodes, weights = precision.gauss(2*k + 1 + alpha, e, mu0, nodes, dtype)
+    return precision.cast((nodes, weights), dtype)
 
-def exponential(n, scale=1):
+def gauss_laguerre_asy(n, alpha=0, points=32):
+    '''
+    Generalized Gauss-Laguerre quadrature for large n, computed in O(n)
+    operations.
+    
+    The nodes are found in increasing order by the Glaser-Liu-Rokhlin
+    method: from each node, the Taylor series of L_n^(α) generated by
+    Laguerre's differential equation,
+        x y'' + (α + 1 - x) y' + n y = 0,
+    is expanded over about one local wavelength (and never more than half
+    the distance to the singular point at 0), and the next node is found by
+    Newton's method, from half a wavelength on. Where that fails, as near
+    the ends of the spectrum, the node is bracketed on a grid of `points`
+    points, or if there is none, the series is expanded again further on.
+    The weights are proportional to 1/(x (dL_n/dx)**2), whose logarithm is
+    accumulated from node to node as it varies over many orders of
+    magnitude, and are scaled to sum to Γ(α+1). Weights too small to be
+    represented in double precision are zero.
+    
+    Glaser, A., Liu, X., and Rokhlin, V., "A fast algorithm for the
+    calculation of the roots of special functions",
+    SIAM J. Sci. Comput., v. 29, 2007, pp. 1420-1438.
+    '''
+    eps = np.finfo(float).eps
+    nodes = np.empty(n)
+    log_dP = np.empty(n)
+    grid = np.arange(points + 1)/points
+    # Start below the first node, which exceeds 2(α+1)/(2n+α+1).
+    x0 = (alpha + 1)/(2*(2*n + alpha + 1))
+    P0, dP0 = _laguerre_origin(n, alpha, x0)
+    log_scale = 0.0
+    for k in range(n):
+        while True:
+            # The local wavelength of the solutions, from the normal form
+            # of the differential equation
+            kappa = n/x0 - (alpha + 1 - x0)**2/(4*x0**2) + (alpha + 1)/(2*x0**2)
+            span = min(x0/2, 3*pi/(2*sqrt(kappa))) if kappa > 0 else x0/2
+            q = _laguerre_series(n, alpha, x0, span, P0, dP0*span, eps)
+            u = _laguerre_newton(q, 2/3, eps) if P0 == 0 else None
+            if (u is not None and 1/3 < u < 1
+                and (_horner(q, u/2)[0] > 0) == (q[1] > 0)):
+                break
+            values = polynomial.polyval(grid, q)
+            start = 1 if P0 == 0 else 0
+            change = np.nonzero(np.sign(values[start:]) != np.sign(values[start]))[0]
+            if len(change):
+                i = start + change[0]
+                u = _laguerre_bracket(q, grid[i-1], grid[i], eps)
+                break
+            # No node within the span: expand again about its far end.
+            P0, dP0 = _horner(q, 1)
+            dP0 /= span
+            size = max(abs(P0), abs(dP0)*span)
+            P0, dP0 = P0/size, dP0/size
+            log_scale += log(size)
+            x0 += span
+        dP0 = _horner(q, u)[1]/span
+        x0 += span*u
+        log_scale += log(abs(dP0))
+        nodes[k], log_dP[k] = x0, log_scale
+        P0, dP0 = 0.0, 1.0
+    log_weights = -log(nodes) - 2*log_dP
+    weights = exp(log_weights - np.max(log_weights))
+    return nodes, weights*special.gamma(alpha + 1)/np.sum(weights)
+
+def _laguerre_origin(n, alpha, x):
+    # L_n^(α)(x)/L_n^(α)(0) and its derivative, from the power series about 0
+    term, P, dP = 1.0, 1.0, 0.0
+    for m in range(n):
+        term *= -(n - m)*x/((m + alpha + 1)*(m + 1))
+        P += term
+        dP += (m + 1)*term/x
+        if abs(term) <= np.finfo(float).eps*abs(P)/4:
+            break
+    return P, dP
+
+def _laguerre_series(n, alpha, x0, span, q0, q1, eps, maxterms=300):
+    # Taylor coefficients in u = (x - x0)/span of the solution of Laguerre's
+    # differential equation with the given value and u-derivative at x0,
+    # up to the first terms that are negligible for |u| <= 1
+    q = [q0, q1]
+    tol = eps*max(abs(q0), abs(q1))/8
+    a, r = alpha + 1 - x0, span/x0
+    for m in range(maxterms - 2):
+        q.append(-r*((m + a)*(m + 1)*q[m+1] + (n - m)*span*q[m])/((m + 2)*(m + 1)))
+        if m > 2 and abs(q[-1]) + abs(q[-2]) <= tol:
+            break
+    return q
+
+def _laguerre_newton(q, u, eps, iterations=10):
+    # A root of the polynomial with coefficients q, from u, or None
+    for _ in range(iterations):
+        P, dP = _horner(q, u)
+        step = P/dP
+        u -= step
+        if abs(step) <= 2*eps*abs(u):
+            return u
+    return None
+
+def _laguerre_bracket(q, a, b, eps):
+    # The root of the polynomial with coefficients q in [a, b], where it
+    # changes sign, by Newton's method safeguarded by bisection
+    sign = _horner(q, a)[0] > 0
+    u = (a + b)/2
+    while b - a > 2*eps*b:
+        P, dP = _horner(q, u)
+        if (P > 0) == sign:
+            a = u
+        else:
+            b = u
+        step = P/dP if dP else np.inf
+        if abs(step) <= 2*eps*abs(u):
+            break
+        u = u - step if a < u - step < b else (a + b)/2
+    return u
+
+def _horner(q, u):
+    # The polynomial with coefficients q and its derivative at u
+    P = dP = 0.0
+    for c in reversed(q):
+        dP = dP*u + P
+        P = P*u + c
+    return P, dP
+
+def exponential(n, scale=1, dtype=None):
     '''
     Gauss-Laguerre quadrature:
     
     A rule of order 2*n-1 on the ray with respect to the PDF of an
     exponential distribution with arbitrary scale.
     '''
-    nodes, weights = special.roots_laguerre(n)
+    nodes, weights = gauss_laguerre(n, dtype=precision.working(dtype))
     nodes = scale*nodes
     
-    return nodes, weights
+    return precision.cast((nodes, weights), dtype)
 
-def gamma(n, alpha, scale=1):
+def gamma(n, alpha, scale=1, dtype=None):
     '''
     Generalized Gauss-Laguerre quadrature:
     
     A rule of order 2*n-1 on the ray with respect to the PDF of a
     gamma distribution with arbitrary scale and shape parameter `alpha`.
     '''
-    return special.roots_genlaguerre(n, alpha)
+    nodes, weights = gauss_genlaguerre(n, alpha - 1,
+                                       dtype=precision.working(dtype))
     nodes *= scale
     weights /= np.sum(weights)
     
-    return nodes, weights
+    return precision.cast((nodes, weights), dtype)
@@ -0,0 +1,86 @@
+import numpy as np
+
+# Tests for whether points (as an n×d array) lie in the named regions.
+regions = {
+    'interval': lambda x: np.all(np.abs(x) <= 1, axis=-1),
+    'square': lambda x: np.all(np.abs(x) <= 1, axis=-1),
+    'cube': lambda x: np.all(np.abs(x) <= 1, axis=-1),
+    'disk': lambda x: np.sum(x**2, axis=-1) <= 1,
+    'ball': lambda x: np.sum(x**2, axis=-1) <= 1,
+    'ray': lambda x: np.all(x >= 0, axis=-1),
+    'line': lambda x: np.ones(len(x), dtype=bool),
+    'plane': lambda x: np.ones(len(x), dtype=bool),
+}
+
+class Rule:
+    '''
+    A cubature rule with its nodes stored as one C-contiguous n×d array
+    and its weights as a one-dimensional array of length n, both in the
+    common floating-point type of the inputs.
+    
+    `degree` and `region` are optional metadata. If the region is one of
+    those in `regions` (given a tolerance of a few ulps), `inside` records
+    whether all the nodes lie in it; otherwise it is None. `positive`
+    records whether all the weights are positive.
+    
+    A rule unpacks like the tuples returned by the rule constructors,
+    `(x, y), w = rule`, where the coordinate arrays are views of the
+    columns of `nodes` rather than copies.
+    '''
+    __slots__ = ('nodes', 'weights', 'degree', 'region', 'inside', 'positive')
+    
+    def __init__(self, nodes, weights, degree=None, region=None):
+        nodes = np.ascontiguousarray(nodes)
+        weights = np.ascontiguousarray(weights)
+        # Keep floating-point inputs (float32, longdouble) in their own
+        # precision; integer inputs become float64.
+        dtype = np.result_type(nodes, weights)
+        if not np.issubdtype(dtype, np.floating):
+            dtype = np.result_type(dtype, float)
+        if nodes.ndim == 1:
+            nodes = nodes[:, np.newaxis]
+        self.nodes = nodes.astype(dtype, copy=False)
+        self.weights = weights.astype(dtype, copy=False)
+        self.degree = degree
+        self.region = region
+        if region in regions:
+            scale = 1 + 4*np.finfo(dtype).eps
+            self.inside = bool(np.all(regions[region](self.nodes/scale)))
+        else:
+            self.inside = None
+        self.positive = bool(np.all(self.weights > 0))
+    
+    @classmethod
+    def from_tuple(cls, rule, degree=None, region=None):
+        '''
+        Create a Rule from the output of any rule constructor,
+        for example `Rule.from_tuple(square.radon_7pt(), 5, 'square')`.
+        '''
+        from cubit.integrate import unpack
+        coords, weights = unpack(rule)
+        return cls(np.stack(coords, axis=-1), weights, degree, region)
+    
+    @property
+    def npoints(self):
+        return len(self.weights)
+    
+    @property
+    def dim(self):
+        return self.nodes.shape[1]
+    
+    @property
+    def coords(self):
+        '''
+        The coordinates of the nodes, as a tuple of views of the columns
+        of `nodes`.
+        '''
+        return tuple(self.nodes.T)
+    
+    def __iter__(self):
+        coords = self.coords
+        yield coords[0] if self.dim == 1 else coords
+        yield self.weights
+    
+    def __repr__(self):
+        return (f'Rule(npoints={self.npoints}, dim={self.dim}, '
+                f'degree={self.degree}, region={self.region!r})')
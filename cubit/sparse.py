@@ -0,0 +1,121 @@
+from itertools import combinations
+from math import comb
+import numpy as np
+from cubit import interval
+
+def clenshaw_curtis_level(level):
+    '''
+    Nested Clenshaw-Curtis rule for the given level: one point for
+    level 1 and 2**(level-1) + 1 points above that.
+    '''
+    n = 1 if level == 1 else 2**(level - 1) + 1
+    return interval.clenshaw_curtis(n)
+
+def fejer2_level(level):
+    '''
+    Nested rule for the given level from Fejér's second rule,
+    with 2**level - 1 points, none of them at the endpoints.
+    '''
+    return interval.fejer2(2**level - 1)
+
+def gauss_legendre_level(level):
+    '''
+    Gauss-Legendre rule with 2*level - 1 points for the given level
+    (not nested), of order 4*level - 3.
+    '''
+    return interval.gauss_legendre(2*level - 1)
+
+def trapz_level(level):
+    '''
+    Nested trapezoid rule with 2**(level-1) subintervals for the given
+    level. Suitable for periodic integrands.
+    '''
+    return interval.trapz(2**(level - 1))
+
+def simps_level(level):
+    '''
+    Nested Simpson's rule with 2**(level-1) panels (2**level + 1 points)
+    for the given level.
+    '''
+    return interval.simps(2**(level - 1))
+
+levels = {
+    'clenshaw_curtis': clenshaw_curtis_level,
+    'fejer2': fejer2_level,
+    'gauss_legendre': gauss_legendre_level,
+    'trapz': trapz_level,
+    'simps': simps_level,
+}
+
+def multi_indices(d, total):
+    '''
+    All d-tuples of positive integers summing to `total`, as the rows
+    of an array.
+    '''
+    if total < d:
+        return np.zeros((0, d), dtype=int)
+    # Stars and bars: choose d-1 cut points among total-1 gaps.
+    cuts = np.array(list(combinations(range(1, total), d - 1)), dtype=int)
+    cuts = cuts.reshape(-1, d - 1)
+    bounds = np.concatenate((np.zeros((len(cuts), 1), dtype=int), cuts,
+                             np.full((len(cuts), 1), total)), axis=1)
+    return np.diff(bounds, axis=1)
+
+def smolyak(level, d, rule='clenshaw_curtis', lower=-1, upper=1, tol=1e-12):
+    '''
+    Smolyak sparse-grid rule on the box [lower, upper]**d:
+    
+    Combines one-dimensional rules Q_1, Q_2, ... (`rule` is either the
+    name of one of the sequences in `levels` or a function taking the level
+    and returning nodes and weights on [-1, 1]) by the combination technique,
+        A(q, d) = Σ (-1)**(q-|i|) binom(d-1, q-|i|) Q_{i_1} ⊗ ... ⊗ Q_{i_d},
+    summing over multi-indices i with q-d+1 <= |i| <= q, where
+    q = level + d - 1. For nested sequences such as Clenshaw-Curtis,
+    this is exact for polynomials of total degree 2*level - 1, and the
+    number of points grows only polynomially in d.
+    Coinciding nodes (to within `tol`) are merged and their weights summed,
+    and nodes whose weights cancel are dropped.
+    
+    `lower` and `upper` may be scalars or arrays of length d.
+    Returns a tuple of d coordinate arrays and an array of weights.
+    
+    Smolyak, S. A., "Quadrature and interpolation formulas for tensor
+    products of certain classes of functions", Dokl. Akad. Nauk SSSR,
+    v. 4, 1963, pp. 240-243.
+    '''
+    if isinstance(rule, str):
+        rule = levels[rule]
+    q = level + d - 1
+    cache = {}
+    all_nodes = []
+    all_weights = []
+    for total in range(max(d, q - d + 1), q + 1):
+        coefficient = (-1)**(q - total)*comb(d - 1, q - total)
+        for index in multi_indices(d, total):
+            factors = []
+            for l in index:
+                if l not in cache:
+                    cache[l] = rule(l)
+                factors.append(cache[l])
+            grids = np.meshgrid(*(nodes for nodes, _ in factors), indexing='ij')
+            weights = coefficient*np.ones(())
+            for _, w in factors:
+                weights = np.multiply.outer(weights, w)
+            all_nodes.append(np.stack([grid.ravel() for grid in grids], axis=-1))
+            all_weights.append(weights.ravel())
+    nodes = np.concatenate(all_nodes)
+    weights = np.concatenate(all_weights)
+    
+    keys = np.round(nodes/tol).astype(np.int64)
+    _, first, inverse = np.unique(keys, axis=0, return_index=True,
+                                  return_inverse=True)
+    weights = np.bincount(inverse.ravel(), weights=weights)
+    nodes = nodes[first]
+    keep = np.abs(weights) > tol*np.max(np.abs(weights))
+    nodes, weights = nodes[keep], weights[keep]
+    
+    lower = np.broadcast_to(lower, d).astype(float)
+    upper = np.broadcast_to(upper, d).astype(float)
+    nodes = (upper + lower)/2 + (upper - lower)/2*nodes
+    weights = weights*np.prod((upper - lower)/2)
+    return tuple(nodes.T), weights
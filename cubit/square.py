@@ -1,8 +1,8 @@
 import numpy as np
 from numpy import pi, sin, cos, exp, log, sqrt
-from cubit import interval
+from cubit import interval, precision, tensor
 
-def prod_trapz(m1, m2):
+def prod_trapz(m1, m2, lazy=False, dtype=None):
     '''
     Product trapezoid rule (Stroud C2: 1-5):
     
@@ -10,62 +10,55 @@ def prod_trapz(m1, m2):
     This is a first-order rule with four points.
     When tiled with m1 points on one side and m2 on the other,
     it uses a total of (m1+1)*(m2+1) points.
+    If `lazy` is true, the rule is returned as a `tensor.TensorRule`.
     '''
-    hx, hy = 2/m1, 2/m2
-    x_nodes = np.tile(np.linspace(-1, 1, m1+1), m2+1)
-    y_nodes = np.repeat(np.linspace(-1, 1, m2+1), m1+1)
-    weights = np.full((m1+1)*(m2+1), h*k)
-    weights[0] = weights[m1] = weights[-m1-1] = weights[-1] = hx*hy/4
-    weights[1:m1] = weights[-m1:-1] = np.full(m1-1, hx*hy/2)
-    weights[m1+1:-m1-1:m1+1] = np.full(m2-1, hx*hy/2)
-    weights[2*m1+1:-m1-2:m1+1] = np.full(m2-1, hx*hy/2)
-    return (x_nodes, y_nodes), weights
+    work = precision.working(dtype)
+    rule = tensor.product(interval.trapz(m1, dtype=work),
+                          interval.trapz(m2, dtype=work))
+    return precision.cast(rule if lazy else rule.materialize(), dtype)
     
 
-def prod_simps(m1, m2):
+def prod_simps(m1, m2, lazy=False, dtype=None):
     '''
     Product Simpson's rule (Stroud C2: 3-3):
     
     The product form of Simpson's rule.
     This is a third-order rule with nine points.
+    If `lazy` is true, the rule is returned as a `tensor.TensorRule`.
     '''
-    nodes_x, weights_x = interval.simps(m1)
-    nodes_y, weights_y = interval.simps(m2)
-    x_nodes = np.tile(nodes_x, m2)
-    y_nodes = np.repeat(nodes_y, m1)
-    weights = np.tile(weights_x, m2) * np.repeat(weights_y, m1)
-    return (x_nodes, y_nodes), weights
+    work = precision.working(dtype)
+    rule = tensor.product(interval.simps(m1, dtype=work),
+                          interval.simps(m2, dtype=work))
+    return precision.cast(rule if lazy else rule.materialize(), dtype)
 
-def prod_gauss(n1, n2):
+def prod_gauss(n1, n2, lazy=False, dtype=None):
     '''
     Product Gauss rule (Stroud C2: 3-1, 5-4, 7-4):
     
     The product form of a Gauss-Legendre quadrature rule.
     If n1 == n2 == n, this is a rule of order 2*n-1, using n**2 points.
+    If `lazy` is true, the rule is returned as a `tensor.TensorRule`.
     '''
-    nodes1, weights1 = interval.leggauss(n1)
-    nodes2, weights2 = interval.leggauss(n2)
-    x_nodes = np.tile(nodes1, n2)
-    y_nodes = np.repeat(nodes2, n1)
-    weights = np.tile(weights1, n2) * np.repeat(weights2, n1)
-    return (x_nodes, y_nodes), weights
+    work = precision.working(dtype)
+    rule = tensor.product(interval.gauss_legendre(n1, dtype=work),
+                          interval.gauss_legendre(n2, dtype=work))
+    return precision.cast(rule if lazy else rule.materialize(), dtype)
 
-def prod_newton_cotes(m1, m2, n1, n2):
+def prod_newton_cotes(m1, m2, n1, n2, lazy=False, dtype=None):
     '''
     Product Newton-Cotes rule:
     
     The product form of an arbitrary Newton-Cotes rule.
     If n is even, this rule has order n-1; if n is odd, it has order n.
     It uses n**2 points.
+    If `lazy` is true, the rule is returned as a `tensor.TensorRule`.
     '''
-    nodes1, weights1 = interval.newton_cotes(m1, n1)
-    nodes2, weights2 = interval.newton_cotes(m2, n2)
-    x_nodes = np.tile(nodes1, m2)
-    y_nodes = np.repeat(nodes2, m1)
-    weights = np.tile(weights1, m2) * np.repeat(weights2, m1)
-    return (x_nodes, y_nodes), weights
+    work = precision.working(dtype)
+    rule = tensor.product(interval.newton_cotes(m1, n1, dtype=work),
+                          interval.newton_cotes(m2, n2, dtype=work))
+    return precision.cast(rule if lazy else rule.materialize(), dtype)
 
-def ewing_quincunx(m1, m2):
+def ewing_quincunx(m1, m2, dtype=None):
     '''
     Ewing's quincuncial rule (Stroud C2: 3-2):
     
@@ -77,26 +70,28 @@ def ewing_quincunx(m1, m2):
     Ewing, G. M., "On approximate cubature",
     Amer. Math. Monthly, v. 4, 1941, pp. 134-136.
     '''
-    longrow = np.linspace(-1, 1, m1 + 1)
-    shortrow = np.linspace(-1 + 1/m1, 1 - 1/m1, m1)
-    nodes_x = np.empty((m1 + 1)*(m2 + 1) + m1*m2)
-    nodes_y = np.empty((m1 + 1)*(m2 + 1) + m1*m2)
-    weights = np.empty((m1 + 1)*(m2 + 1) + m1*m2)
+    work = precision.working(dtype)
+    one = work.type(1)
+    longrow = np.linspace(-one, one, m1 + 1)
+    shortrow = np.linspace(-1 + one/m1, 1 - one/m1, m1)
+    nodes_x = np.empty((m1 + 1)*(m2 + 1) + m1*m2, dtype=work)
+    nodes_y = np.empty((m1 + 1)*(m2 + 1) + m1*m2, dtype=work)
+    weights = np.empty((m1 + 1)*(m2 + 1) + m1*m2, dtype=work)
     for i in range(m2):
         nodes_x[(2*m1 + 1)*i : (2*m1 + 1)*i + m1 + 1] = longrow
         nodes_y[(2*m1 + 1)*i : (2*m1 + 1)*i + m1 + 1] = longrow[i]
-        weights[(2*m1 + 1)*i] = weights[(2*m1 + 1)*i + m1] = 1/6
-        weights[(2*m1 + 1)*i + 1 : (2*m1 + 1)*i + m1] = 1/3
+        weights[(2*m1 + 1)*i] = weights[(2*m1 + 1)*i + m1] = one/6
+        weights[(2*m1 + 1)*i + 1 : (2*m1 + 1)*i + m1] = one/3
         nodes_x[(2*m1 + 1)*i + m1 + 1 : (2*m1 + 1)*(i + 1)] = shortrow
         nodes_y[(2*m1 + 1)*i + m1 + 1 : (2*m1 + 1)*(i + 1)] = shortrow[i]
-        weights[(2*m1 + 1)*i + m1 + 1 : (2*m1 + 1)*(i + 1)] = 2/3
-    weights[0 : m1 + 1] *= 1/2
+        weights[(2*m1 + 1)*i + m1 + 1 : (2*m1 + 1)*(i + 1)] = 2*one/3
+    weights[0 : m1 + 1] /= 2
     nodes_x[(2*m1 + 1)*m2:] = longrow
     nodes_y[(2*m1 + 1)*m2:] = longrow[-1]
-    weights[(2*m1 + 1)*m2] = weights[-1] = 1/12
-    weights[(2*m1 + 1)*m2 + 1 : -1] = 1/6
-    weights *= 4/(m1*m2)
-    return (nodes_x, nodes_y), weights
+    weights[(2*m1 + 1)*m2] = weights[-1] = one/12
+    weights[(2*m1 + 1)*m2 + 1 : -1] = one/6
+    weights *= 4*one/(m1*m2)
+    return precision.cast(((nodes_x, nodes_y), weights), dtype)
 
 def ac_9pt(m1, m2):
     '''
@@ -124,6 +119,7 @@ def irwin_12pt():
     '''
     pass
 
+@precision.with_dtype
 def radon_7pt():
     '''
     Radon's seven-point rule (Stroud C2: 5-1):
@@ -148,6 +144,7 @@ def radon_7pt():
     weights *= 4
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def ac_7pt():
     '''
     Albrecht-Collatz seven-point rule (Stroud C2: 5-2):
@@ -167,6 +164,7 @@ def ac_7pt():
     weights *= 4
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def burnside_8pt():
     '''
     Burnside's eight-point rule (Stroud C2: 5-3):
@@ -189,6 +187,7 @@ def burnside_8pt():
     weights *= 4
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def tyler_13pt():
     '''
     Tyler's thirteen-point rule (Stroud C2: 5-5):
@@ -210,6 +209,7 @@ def tyler_13pt():
     weights *= 4
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def meister_13pt():
     '''
     Meister's thirteen-point rule (Stroud C2: 5-6):
@@ -229,6 +229,7 @@ def meister_13pt():
     weights *= 4
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def irwin_24pt():
     '''
     Irwin's 24-point rule (Stroud C2: 5-7):
@@ -254,6 +255,7 @@ def irwin_24pt():
     weights *= 4/2880
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def tyler_12pt():
     '''
     Tyler's twelve-point rule (Stroud C2: 7-1):
@@ -280,6 +282,7 @@ def tyler_12pt():
                         B1, B2, B3, B1, B2, B3])
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def mysovskikh_12pt():
     '''
     Mysovskikh-Phillips twelve-point rule (Stroud C2: 7-2):
@@ -312,6 +315,7 @@ def mysovskikh_12pt():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def maxwell_13pt():
     '''
     Maxwell's thirteen-point rule (Stroud C2: 7-3):
@@ -338,6 +342,7 @@ def maxwell_13pt():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def tyler_21pt():
     '''
     Tyler's 21-point rule (Stroud C2: 7-5):
@@ -364,6 +369,7 @@ def tyler_21pt():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def meister_25pt():
     '''
     Meister's 25-point rule (Stroud C2: 7-6):
@@ -376,7 +382,7 @@ def meister_25pt():
     x_nodes = np.array([   0,  2/3,    1,  1,  2/3,  1/3,  1/3,
                                  0, -1/3, -1, -2/3, -1/3,   -1,
                               -2/3,   -1, -1, -2/3, -1/3, -1/3,
-                                 0,  1/3,  1   2/3,  1/3,  1/3])
+                                 0,  1/3,  1,  2/3,  1/3,  1/3])
     y_nodes = np.array([   0,    0,  1/3,  1,  2/3,  1/3,    1,
                                2/3,    1,  1,  2/3,  1/3,  1/3,
                                  0, -1/3, -1, -2/3, -1/3,   -1,
@@ -389,6 +395,7 @@ def meister_25pt():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def rr_20pt():
     '''
     Rabinowitz-Richter 20-point rule (Stroud C2: 9-1):
@@ -418,6 +425,7 @@ def rr_20pt():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def chanut_21pt():
     '''
     Chanut's first 21-point rule (Stroud C2: 9-2):
@@ -446,6 +454,7 @@ def chanut_21pt():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def chanut_21pt2():
     '''
     Chanut's second 21-point rule (Stroud C2: 9-2):
@@ -474,6 +483,7 @@ def chanut_21pt2():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def chanut_25pt():
     '''
     Chanut's first 25-point rule (Stroud C2: 9-3):
@@ -503,6 +513,7 @@ def chanut_25pt():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def chanut_25pt2():
     '''
     Chanut's second 25-point rule (Stroud C2: 9-3):
@@ -532,6 +543,7 @@ def chanut_25pt2():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def rr_25pt():
     '''
     Rabinowitz-Richter 25-point rule (Stroud C2: 11-1):
@@ -557,7 +569,7 @@ def rr_25pt():
     
     x_nodes = np.array([ 0,  r1,  r2,  s5,  r3,  r4,  r5,
                               0,   0, -r5, -r3, -r4, -s5,
-                            -r1, -r2, -s5, -r3, -r4, -r5
+                            -r1, -r2, -s5, -r3, -r4, -r5,
                               0,   0,  r5,  r3,  r4,  s5])
     y_nodes = np.array([ 0,   0,   0,  r5,  r3,  r4,  s5,
                              r1,  r2,  s5,  r3,  r4,  r5,
@@ -570,6 +582,7 @@ def rr_25pt():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def rr_28pt():
     '''
     Rabinowitz-Richter 28-point rule (Stroud C2: 11-2):
@@ -609,6 +622,7 @@ def rr_28pt():
     
     return (x_nodes, y_nodes, weights)
 
+@precision.with_dtype
 def rr_37pt():
     '''
     Rabinowitz-Richter 37-point rule (Stroud C2: 13-1):
@@ -653,6 +667,7 @@ def rr_37pt():
     return (x_nodes, y_nodes), weights
     
 
+@precision.with_dtype
 def rr_44pt():
     '''
     Rabinowitz-Richter 44-point rule (Stroud C2: 15-1):
@@ -699,6 +714,7 @@ def rr_44pt():
     
     return (x_nodes, y_nodes), weights
 
+@precision.with_dtype
 def rr_48pt():
     '''
     Rabinowitz-Richter 48-point rule (Stroud C2: 15-2):
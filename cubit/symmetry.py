@@ -0,0 +1,95 @@
+import numpy as np
+from itertools import permutations
+from cubit.integrate import unpack, evaluate, contract
+
+def dihedral(k):
+    '''
+    The dihedral group of order 2*k (the symmetries of a regular k-gon
+    with a vertex on the positive x-axis), as a (2k)×2×2 array of matrices.
+    '''
+    theta = 2*np.pi*np.arange(k)/k
+    c, s = np.cos(theta), np.sin(theta)
+    rotations = np.stack((np.stack((c, -s), -1), np.stack((s, c), -1)), -2)
+    reflections = rotations @ np.diag([1, -1])
+    return np.concatenate((rotations, reflections))
+
+def barycentric():
+    '''
+    The symmetric group S3 acting on barycentric coordinates by permuting
+    them (the symmetries of a triangle), as a 6×3×3 array of matrices.
+    '''
+    return np.array([np.eye(3)[list(p)] for p in permutations(range(3))])
+
+# The symmetry groups of the regions with fully symmetric rules.
+groups = {
+    'square': dihedral(4),
+    'hexagon': dihedral(6),
+    'octagon': dihedral(8),
+    'triangle': barycentric(),
+}
+
+def _group(group):
+    return groups[group] if isinstance(group, str) else np.asarray(group)
+
+def expand(representatives, weights, group, tol=1e-12):
+    '''
+    Expand a rule given by orbit representatives (an r×d array) and the
+    weight of each point in the orbit into the full rule, by applying
+    every element of `group` (a name from `groups` or an array of d×d
+    matrices) to all representatives at once. Points in the same orbit
+    that coincide to within `tol`, such as those on an axis of symmetry,
+    are only included once.
+    
+    Returns a tuple of d coordinate arrays and an array of weights.
+    '''
+    group = _group(group)
+    representatives = np.atleast_2d(representatives)
+    points = np.einsum('gij,rj->rgi', group, representatives)
+    r, g, d = points.shape
+    labels = np.repeat(np.arange(r), g)
+    points = points.reshape(r*g, d)
+    keys = np.concatenate((labels[:,np.newaxis],
+                           np.round(points/tol).astype(np.int64)), axis=1)
+    _, first = np.unique(keys, axis=0, return_index=True)
+    first = np.sort(first)
+    return tuple(points[first].T), np.asarray(weights)[labels[first]]
+
+def orbits(rule, group, tol=1e-12):
+    '''
+    Reduce a fully symmetric rule to its orbits under `group`.
+    
+    Returns a tuple of the representatives (an r×d array), the weight of
+    each point in the orbit, and the number of points in each orbit.
+    Raises ValueError if the rule is not invariant under the group.
+    '''
+    group = _group(group)
+    coords, weights = unpack(rule)
+    nodes = np.stack(coords, axis=-1)
+    images = np.einsum('gij,nj->ngi', group, nodes)
+    keys = np.round(images/tol).astype(np.int64)
+    # The canonical image of each point is its lexicographically largest one.
+    best = np.ones(keys.shape[:2], dtype=bool)
+    for j in range(keys.shape[2]):
+        column = np.where(best, keys[..., j], np.iinfo(np.int64).min)
+        best &= column == np.max(column, axis=1, keepdims=True)
+    choice = np.argmax(best, axis=1)
+    canonical = keys[np.arange(len(nodes)), choice]
+    _, first, inverse, counts = np.unique(canonical, axis=0, return_index=True,
+                                          return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    representatives = images[first, choice[first]]
+    orbit_weights = weights[first]
+    orbit_sizes = np.array([len(np.unique(keys[i], axis=0)) for i in first])
+    if (np.any(counts != orbit_sizes)
+        or not np.allclose(weights, orbit_weights[inverse], rtol=1e-10, atol=0)):
+        raise ValueError('rule is not invariant under the group')
+    return representatives, orbit_weights, counts
+
+def integrate(f, orbit_rule):
+    '''
+    Integrate a function invariant under the group, given a rule reduced
+    by `orbits`, evaluating it only at the orbit representatives, with
+    each weight scaled by the size of its orbit.
+    '''
+    representatives, weights, counts = orbit_rule
+    return contract(evaluate(f, tuple(representatives.T)), weights*counts)
@@ -0,0 +1,140 @@
+import numpy as np
+from cubit import interval, line
+from cubit.integrate import evaluate, contract
+
+class TensorRule:
+    '''
+    A tensor-product rule in any number of dimensions, stored as its
+    one-dimensional factors. Nodes and weights are only generated on
+    demand, in blocks of bounded size, so the memory needed is
+    independent of the total number of points.
+    
+    The points are ordered as in `square.prod_gauss`, with the first
+    coordinate varying fastest.
+    '''
+    def __init__(self, factors):
+        self.factors = [(np.asarray(nodes), np.asarray(weights))
+                        for nodes, weights in factors]
+    
+    @property
+    def shape(self):
+        return tuple(len(weights) for _, weights in self.factors)
+    
+    @property
+    def ndim(self):
+        return len(self.factors)
+    
+    def __len__(self):
+        return int(np.prod(self.shape))
+    
+    def block(self, start, stop):
+        '''
+        Return the nodes (as a tuple of coordinate arrays) and weights of
+        the points with flat indices start, ..., stop-1.
+        '''
+        indices = np.unravel_index(np.arange(start, min(stop, len(self))),
+                                   self.shape, order='F')
+        nodes = tuple(x[i] for (x, _), i in zip(self.factors, indices))
+        dtype = np.result_type(*(w for _, w in self.factors))
+        weights = np.ones(len(indices[0]), dtype=dtype)
+        for (_, w), i in zip(self.factors, indices):
+            weights *= w[i]
+        return nodes, weights
+    
+    def blocks(self, size=2**16):
+        '''
+        Yield the nodes and weights in blocks of at most `size` points.
+        '''
+        for start in range(0, len(self), size):
+            yield self.block(start, start + size)
+    
+    def materialize(self):
+        '''
+        Return all nodes and weights, in the layout of `square.prod_gauss`.
+        '''
+        return self.block(0, len(self))
+    
+    def integrate(self, f, size=2**16):
+        '''
+        Integrate `f`, called as `f(*nodes)` on one block of at most `size`
+        points at a time (see `integrate.integrate`).
+        '''
+        total = 0
+        for nodes, weights in self.blocks(size):
+            total = total + contract(evaluate(f, nodes), weights)
+        return total
+    
+    def grid(self):
+        '''
+        Return the one-dimensional nodes of each factor shaped to broadcast
+        against each other, so that `f(*rule.grid())` evaluates `f` on the
+        whole tensor grid with an array of shape `rule.shape`.
+        '''
+        shape = [1]*self.ndim
+        grid = []
+        for k, (nodes, _) in enumerate(self.factors):
+            shape[k] = -1
+            grid.append(nodes.reshape(shape))
+            shape[k] = 1
+        return tuple(grid)
+    
+    def contract(self, values):
+        '''
+        Contract an array of function values on the tensor grid against
+        the weights, one axis at a time (`w1 @ F @ w2` in two dimensions).
+        The last `ndim` axes of `values` run over the grid; axes of length 1
+        are taken to be constant along that direction, so integrands that do
+        not depend on every coordinate need not be broadcast to full size.
+        Any leading axes are kept, giving array-valued integrals.
+        '''
+        values = np.asarray(values)
+        values = values.reshape((1,)*(self.ndim - values.ndim) + values.shape)
+        for _, weights in reversed(self.factors):
+            if values.shape[-1] == 1:
+                values = values[..., 0]*np.sum(weights)
+            else:
+                values = values @ weights
+        return values
+    
+    def integrate_grid(self, f):
+        '''
+        Integrate `f` by evaluating it once on the broadcast grid,
+        `f(*rule.grid())`, and contracting axis by axis. This avoids
+        forming the flattened node and weight arrays altogether.
+        '''
+        return self.contract(f(*self.grid()))
+
+def product(*rules):
+    '''
+    The tensor product of one-dimensional rules, each given as a tuple
+    of nodes and weights.
+    '''
+    return TensorRule(rules)
+
+def prod_gauss(*ns, lower=-1, upper=1, dtype=None):
+    '''
+    Product Gauss-Legendre rule on [lower, upper]**d, with ns[k] points
+    along axis k. If all ns are equal to n, this is a rule of order 2*n-1.
+    '''
+    return TensorRule([interval.gauss_legendre(n, lower, upper, dtype) for n in ns])
+
+def prod_trapz(*ms, lower=-1, upper=1, dtype=None):
+    '''
+    Product trapezoid rule on [lower, upper]**d, with ms[k] subintervals
+    along axis k.
+    '''
+    return TensorRule([interval.trapz(m, lower, upper, dtype) for m in ms])
+
+def prod_simps(*ms, lower=-1, upper=1, dtype=None):
+    '''
+    Product Simpson's rule on [lower, upper]**d, with ms[k] subintervals
+    along axis k.
+    '''
+    return TensorRule([interval.simps(m, lower, upper, dtype) for m in ms])
+
+def prod_hermgauss(*ns, dtype=None):
+    '''
+    Product Gauss-Hermite rule on d-dimensional space, with respect to
+    the weight function w(x) = exp(-|x|**2).
+    '''
+    return TensorRule([line.gauss_hermite(n, dtype) for n in ns])
@@ -1,10 +1,24 @@
 import numpy as np
 from numpy import pi, sin, cos, exp, log, sqrt
+from cubit import precision
 
 def conprod_gauss():
     pass
 
-def from_barycentric(nodes, weights, vertices):
+def areas(vertices):
+    '''
+    Compute the areas of one or more triangles, given as an array of
+    shape (..., 3, d) with the vertices of each triangle as rows.
+    The triangles need not lie in a plane.
+    '''
+    a = vertices[..., 1, :] - vertices[..., 0, :]
+    b = vertices[..., 2, :] - vertices[..., 0, :]
+    aa = np.sum(a*a, axis=-1)
+    bb = np.sum(b*b, axis=-1)
+    ab = np.sum(a*b, axis=-1)
+    return 1/2*np.sqrt(np.maximum(aa*bb - ab**2, 0))
+
+def from_barycentric(nodes, weights, vertices, triangles=None):
     '''
     Compute nodes and weights of a cubature rule on a triangle with
     specified vertices from the barycentric coordinates of the nodes and 
@@ -13,18 +27,24 @@ def from_barycentric(nodes, weights, vertices):
     `nodes` should contain the barycentric coordinates of the nodes as 
             an n×3 array, where `n` is the number of nodes.
     `weights` should contain the `n` relative weights (summing to 1).
-    `vertices` should be a 3×2 array with the vertices as rows. 
+    `vertices` should be a 3×d array with the vertices as rows. 
     
-    Returns a tuple of an n×2 array whose columns are the nodes and
+    Returns a tuple of a d×n array whose columns are the nodes and
     a one-dimensional array of length n containing the weights
     (summing to the area of the triangle).
+    
+    To apply the rule to every triangle of a mesh at once, `vertices` may
+    instead be a T×3×d array, or a V×d array of points together with a T×3
+    array `triangles` of vertex indices. The nodes are then returned as a
+    T×n×d array and the weights as a T×n array.
     '''
-    sqnorms = np.sum(vertices**2, axis=1)
-    cm_matrix = np.ones((4, 4)) # For computing Cayley-Menger determinant
-    cm_matrix[-1,-1] = 0
-    cm_matrix[:-1,:-1] = sqnorms + sqnorms[:,np.newaxis] - 2*vertices @ vertices.T
-    area = 1/4*np.sqrt(-np.linalg.det(cm_matrix))
-    return (nodes @ vertices).T, weights*area
+    vertices = np.asarray(vertices)
+    if triangles is not None:
+        vertices = vertices[triangles]
+    area = areas(vertices)
+    if vertices.ndim == 2:
+        return (nodes @ vertices).T, weights*area
+    return nodes @ vertices, weights*area[..., np.newaxis]
 
 def centroid(m=1):
     '''
@@ -47,7 +67,8 @@ def wedge(m=1):
     to integrate over the m*(m+1)/2 sub-triangles.
     '''
 
-def ac_6pt():
+@precision.with_dtype
+def ac_6pt(vertices, triangles=None):
     '''
     Albrecht-Collatz 6-point rule (Stroud T2: 3-1):
     
@@ -67,9 +88,10 @@ def ac_6pt():
                        [0, r, r, v, u, u]])
     weights = np.array([B, B, B, C, C, C])
     
-    return from_barycentric(nodes, weights, vertices)
+    return from_barycentric(nodes.T, weights, vertices, triangles)
 
-def radon_7pt(vertices):
+@precision.with_dtype
+def radon_7pt(vertices, triangles=None):
     '''
     Radon 7-point rule (Stroud T2: 5-1):
     
@@ -93,7 +115,7 @@ def radon_7pt(vertices):
     
     nodes =  np.array([[t, r, r, s, u, u, v],
                        [t, r, s, r, u, v, u],
-                       [t, s, r, s, v, u, u]])
+                       [t, s, r, r, v, u, u]])
     weights = np.array([A, B, B, B, C, C, C])
     
-    return from_barycentric(nodes, weights, vertices)
+    return from_barycentric(nodes.T, weights, vertices, triangles)
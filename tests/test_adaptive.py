@@ -0,0 +1,87 @@
+from itertools import product
+import numpy as np
+import pytest
+from cubit import adaptive, interval, square
+
+def test_gauss_kronrod_rule():
+    nodes, kronrod, gauss = interval.gauss_kronrod()
+    for k in range(24):
+        exact = 2/(k + 1) if k % 2 == 0 else 0
+        assert np.isclose(np.sum(kronrod*nodes**k), exact, atol=1e-15)
+        if k < 14:
+            assert np.isclose(np.sum(gauss*nodes**k), exact, atol=1e-15)
+    assert np.count_nonzero(gauss) == 7
+
+def test_gauss_kronrod_peak():
+    f = lambda x: 1/(x**2 + 1e-4)
+    exact = 2*100*np.arctan(100)
+    value, error, neval = adaptive.gauss_kronrod(f, atol=0, rtol=1e-10)
+    assert abs(value - exact) <= max(error, 1e-12*exact)
+    assert error <= 1e-10*abs(value)
+    assert neval % 15 == 0
+
+def test_gauss_kronrod_max_eval():
+    f = lambda x: np.abs(x - 1/3)**-0.5
+    value, error, neval = adaptive.gauss_kronrod(f, 0, 1, atol=0, rtol=0, max_eval=3000)
+    assert neval <= 3000
+    assert error > 0 and abs(value - 2*(np.sqrt(1/3) + np.sqrt(2/3))) < 5e-2
+
+@pytest.mark.parametrize('d', [1, 2, 3, 4, 5])
+def test_genz_malik_rule(d):
+    nodes, weights, embedded = adaptive.genz_malik_rule(d)
+    assert len(nodes) == 2**d + 2*d**2 + 2*d + 1
+    for powers in product(range(8), repeat=d):
+        if sum(powers) <= 7:
+            # The weights sum to 1, so they give the mean over [-1, 1]**d.
+            exact = np.prod([1/(k + 1) if k % 2 == 0 else 0 for k in powers])
+            values = np.prod(nodes**np.array(powers), axis=1)
+            assert np.isclose(values @ weights, exact, atol=1e-15)
+            if sum(powers) <= 5:
+                assert np.isclose(values @ embedded, exact, atol=1e-15)
+
+def product_peak(a, u):
+    f = lambda *x: np.prod([1/(a**-2 + (xi - u)**2) for xi in x], axis=0)
+    exact = a*(np.arctan(a*(1 - u)) + np.arctan(a*u))
+    return f, exact
+
+@pytest.mark.parametrize('d', [2, 3])
+def test_genz_malik_peak(d):
+    f, exact = product_peak(10, 0.4)
+    value, error, neval = adaptive.genz_malik(f, [0]*d, [1]*d, atol=0, rtol=1e-6)
+    assert abs(value - exact**d) <= max(error, 1e-12*exact**d)
+    assert error <= 1e-6*abs(value)
+
+def test_genz_malik_rule_pair():
+    f, exact = product_peak(10, 0.4)
+    rule = (square.rr_25pt(), square.radon_7pt())
+    value, error, neval = adaptive.genz_malik(f, [0, 0], [1, 1], atol=0, rtol=1e-8,
+                                              rule=rule)
+    assert abs(value - exact**2) <= max(error, 1e-12*exact**2)
+
+def test_genz_malik_max_eval():
+    f, exact = product_peak(100, 0.4)
+    value, error, neval = adaptive.genz_malik(f, [0]*3, [1]*3, atol=0, rtol=0,
+                                              max_eval=10**4)
+    assert neval <= 10**4 and error > 0
+
+def test_triangles_corner_peak():
+    a, b = 20, -15
+    f = lambda x, y: np.exp(a*x + b*y)
+    exact = (np.exp(b)*np.expm1(a - b)/(a - b) - np.expm1(a)/a)/b
+    vertices = [[0, 0], [1, 0], [0, 1]]
+    value, error, neval = adaptive.triangles(f, vertices, atol=0, rtol=1e-8)
+    assert abs(value - exact) <= max(error, 1e-13*exact)
+    assert error <= 1e-8*abs(value)
+
+def test_triangles_triangulation():
+    f, exact = product_peak(5, 0.4)
+    points = [[0, 0], [1, 0], [1, 1], [0, 1]]
+    value, error, neval = adaptive.triangles(f, points, [[0, 1, 2], [0, 2, 3]],
+                                             atol=0, rtol=1e-8)
+    assert abs(value - exact**2) <= max(error, 1e-12*exact**2)
+
+def test_triangles_max_eval():
+    f = lambda x, y: (x**2 + y**2)**-0.75
+    value, error, neval = adaptive.triangles(f, [[0, 0], [1, 0], [0, 1]],
+                                             atol=0, rtol=0, max_eval=5000)
+    assert neval <= 5000 and error > 0
@@ -0,0 +1,15 @@
+from cubit import cache, interval
+
+def test_make_key_normalizes_calls():
+    keys = {cache.make_key(interval.newton_cotes, args, kwargs, float)
+            for args, kwargs in [((5, 2), {}), ((5,), {'n': 2}),
+                                 ((), {'n': 2, 'm': 5}), ((5, 2, -1, 1), {})]}
+    assert len(keys) == 1
+    assert cache.make_key(interval.newton_cotes, (5, 3), {}, float) not in keys
+
+def test_registry_shares_entries():
+    rules = cache.RuleCache()
+    first = rules.get(interval.trapz, 4, upper=2)
+    second = rules.get(interval.trapz, 4, -1, 2)
+    assert first is second
+    assert rules.stats()['hits'] == 1
@@ -0,0 +1,19 @@
+import os
+from mpmath import mp
+from cubit import golub_welsch
+
+def test_persistent_keyword_parameters(tmp_path, monkeypatch):
+    monkeypatch.setattr(golub_welsch, 'cache_dir', str(tmp_path))
+    first, _ = golub_welsch.gauss_jacobi(5, alpha=0.5, beta=1.5)
+    second, _ = golub_welsch.gauss_jacobi(5, alpha=3, beta=-0.5)
+    monkeypatch.setattr(golub_welsch, 'cache_dir', None)
+    expected, _ = golub_welsch.gauss_jacobi(5, 3, -0.5)
+    assert mp.norm(second - expected) == 0
+    assert mp.norm(first - expected) > 0.1
+    assert len(os.listdir(tmp_path)) == 2
+
+def test_persistent_positional_and_keyword(tmp_path, monkeypatch):
+    monkeypatch.setattr(golub_welsch, 'cache_dir', str(tmp_path))
+    golub_welsch.gauss_genlaguerre(4, 0.5)
+    golub_welsch.gauss_genlaguerre(4, alpha=0.5, processes=1)
+    assert len(os.listdir(tmp_path)) == 1
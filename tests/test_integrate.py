@@ -0,0 +1,22 @@
+import numpy as np
+from cubit import integrate, parallel, qmc, tensor
+
+def test_tensor_rule():
+    rule = tensor.prod_gauss(3, 4)
+    f = lambda x, y: x**4*y**2
+    expected = integrate.integrate(f, rule.materialize())
+    assert np.isclose(expected, 4/15, rtol=1e-14)
+    assert integrate.integrate(f, rule) == expected
+    assert np.isclose(integrate.integrate(f, rule, chunksize=5), expected, rtol=1e-14)
+    assert parallel.integrate(f, rule, workers=2, chunksize=5) == \
+        integrate.integrate(f, rule.materialize(), chunksize=5)
+
+def test_qmc_rule():
+    rule = qmc.cube(2**10, 3, 0, 1, seed=1, lazy=True)
+    f = lambda x, y, z: x*y + z
+    expected = integrate.integrate(f, rule.materialize())
+    assert np.isclose(expected, 3/4, rtol=1e-3)
+    assert integrate.integrate(f, rule) == expected
+    assert np.isclose(integrate.integrate(f, rule, chunksize=2**7), expected, rtol=1e-14)
+    assert np.isclose(parallel.integrate(f, rule, workers=2, chunksize=2**7),
+                      expected, rtol=1e-14)
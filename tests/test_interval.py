@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from scipy import special
+from cubit import interval
+
+threshold = interval.asymptotic_threshold
+
+# scipy's Golub-Welsch weights (used up to the threshold) are only good to
+# about 1e-10; the reference is the Golub-Welsch rule refined in longdouble.
+
+@pytest.mark.parametrize('n', [threshold, threshold + 1])
+def test_legendre_asy_matches_golub_welsch(n):
+    x, w = interval.gauss_legendre(n, dtype=np.longdouble)
+    nodes, weights = interval.gauss_legendre_asy(n)
+    assert np.allclose(nodes, x, rtol=0, atol=1e-15)
+    assert np.allclose(weights, w, rtol=1e-14, atol=0)
+    nodes, weights = interval.gauss_legendre(n)
+    assert np.allclose(nodes, x, rtol=0, atol=1e-15)
+    assert np.allclose(weights, w, rtol=1e-10, atol=0)
+
+@pytest.mark.parametrize('n', [threshold, threshold + 1])
+@pytest.mark.parametrize('alpha, beta', [(0.3, -0.6), (-0.5, -0.5), (4, 1.5)])
+def test_jacobi_asy_matches_golub_welsch(n, alpha, beta):
+    x, w = interval.gauss_jacobi(n, alpha, beta, dtype=np.longdouble)
+    nodes, weights = interval.gauss_jacobi_asy(n, alpha, beta)
+    assert np.allclose(nodes, x, rtol=0, atol=1e-15)
+    assert np.allclose(weights, w, rtol=1e-13, atol=0)
+    nodes, weights = interval.gauss_jacobi(n, alpha, beta)
+    assert np.allclose(nodes, x, rtol=0, atol=1e-14)
+    assert np.allclose(weights, w, rtol=1e-9, atol=0)
+
+def test_legendre_asy_exactness():
+    n = 1000
+    x, w = interval.gauss_legendre(n)
+    for k in [0, 1, 10, 500, n - 1]:
+        assert np.isclose(np.sum(w*x**(2*k)), 2/(2*k + 1), rtol=1e-12)
+    assert abs(np.sum(w*x**(2*n - 1))) < 1e-15
+
+@pytest.mark.parametrize('alpha, beta', [(0.3, -0.6), (-0.5, -0.5), (4, 1.5)])
+def test_jacobi_asy_exactness(alpha, beta):
+    n = 1000
+    x, w = interval.gauss_jacobi(n, alpha, beta)
+    for m in [0, 1, 7, 100, 2*n - 1]:
+        exact = 2**(alpha + beta + 1)*np.exp(special.betaln(alpha + 1, beta + m + 1))
+        assert np.isclose(np.sum(w*((1 + x)/2)**m), exact, rtol=1e-12)
+
+def test_gegenbauer_asy():
+    x, w = interval.gauss_gegenbauer(501, 2)
+    assert np.isclose(np.sum(w), np.sqrt(np.pi)*special.gamma(2.5)/special.gamma(3))
+    assert np.allclose(x, -x[::-1], rtol=0, atol=1e-15)
+    assert np.allclose(w, w[::-1], rtol=1e-13, atol=0)
+
+@pytest.mark.parametrize('rule', [interval.clenshaw_curtis, interval.fejer1,
+                                  interval.fejer2])
+@pytest.mark.parametrize('n', [1, 2, 3, 8, 17, 64])
+def test_chebyshev_rules_exactness(rule, n):
+    x, w = rule(n)
+    assert len(x) == n
+    assert np.all(w > 0)
+    for k in range(n):
+        exact = 2/(k + 1) if k % 2 == 0 else 0
+        assert np.isclose(np.sum(w*x**k), exact, rtol=1e-13, atol=1e-15)
+
+def test_chebyshev_rules_small():
+    assert np.array_equal(interval.clenshaw_curtis(1)[0], [0])
+    assert np.allclose(interval.clenshaw_curtis(1)[1], [2])
+    x, w = interval.clenshaw_curtis(2)
+    assert np.allclose(x, [-1, 1]) and np.allclose(w, [1, 1])
+    x, w = interval.fejer1(2)
+    assert np.allclose(x, [-np.sqrt(0.5), np.sqrt(0.5)]) and np.allclose(w, [1, 1])
+    x, w = interval.fejer2(2)
+    assert np.allclose(x, [-0.5, 0.5]) and np.allclose(w, [1, 1])
+    for rule in (interval.fejer1, interval.fejer2):
+        x, w = rule(1)
+        assert np.allclose(x, [0]) and np.allclose(w, [2])
+
+@pytest.mark.parametrize('rule, sizes', [
+    (interval.clenshaw_curtis, [2**k + 1 for k in range(1, 8)]),
+    (interval.fejer2, [2**k - 1 for k in range(1, 8)]),
+    (interval.fejer1, [3**k for k in range(0, 5)]),
+])
+def test_chebyshev_rules_nested(rule, sizes):
+    for coarse, fine in zip(sizes, sizes[1:]):
+        assert np.all(np.isin(rule(coarse)[0], rule(fine)[0]))
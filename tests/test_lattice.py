@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from scipy import special
+from cubit import lattice
+
+@pytest.mark.parametrize('n, d, gammas', [(31, 4, 1), (53, 3, [1, 0.5, 0.25])])
+def test_cbc_matches_brute_force(n, d, gammas):
+    z = lattice.cbc(n, d, gammas)
+    gammas = np.broadcast_to(gammas, d)
+    for j in range(1, d):
+        errors = [lattice.worst_case_error(list(z[:j]) + [c], n, gammas[:j+1])
+                  for c in range(1, n)]
+        assert np.isclose(lattice.worst_case_error(z[:j+1], n, gammas[:j+1]),
+                          min(errors), rtol=1e-12)
+
+def test_cbc_rejects_composite():
+    with pytest.raises(ValueError):
+        lattice.cbc(35, 2)
+
+def test_worst_case_error_decreases():
+    errors = [lattice.worst_case_error(lattice.cbc(n, 3), n) for n in (31, 127, 509)]
+    assert errors[0] > errors[1] > errors[2]
+
+def test_fibonacci_periodic():
+    f = lambda x, y: np.exp(np.sin(2*np.pi*x) + np.cos(2*np.pi*y))
+    exact = special.i0(1)**2
+    for k, tol in [(12, 1e-6), (18, 1e-12)]:
+        nodes, weights = lattice.fibonacci(k, 0, 1)
+        assert abs(np.sum(weights*f(*nodes)) - exact) < tol*exact
@@ -0,0 +1,41 @@
+from math import factorial
+import numpy as np
+import pytest
+import sympy as sym
+from mpmath import mp
+from scipy import special
+from cubit.moments import weight_fn, chebyshev
+
+legendre = weight_fn(lambda k: sym.Rational(2, k + 1) if k % 2 == 0 else 0)
+laguerre = weight_fn(factorial)
+
+def test_legendre_recurrence():
+    n = 20
+    alpha, beta = legendre.recurrence(n)
+    k = np.arange(1, n)
+    assert np.allclose(alpha, 0, atol=1e-15)
+    assert np.isclose(beta[0], 2)
+    assert np.allclose(beta[1:], k**2/(4*k**2 - 1), rtol=1e-14)
+
+def test_laguerre_recurrence():
+    n = 20
+    alpha, beta = laguerre.recurrence(n, dps=30)
+    for k in range(n):
+        assert abs(alpha[k] - (2*k + 1)) < mp.mpf(10)**-25
+        assert abs(beta[k] - (k**2 if k else 1)) < mp.mpf(10)**-25
+
+def test_gauss_matches_scipy():
+    x, w = laguerre.gauss(10)
+    nodes, weights = special.roots_laguerre(10)
+    assert np.allclose(x, nodes, rtol=1e-14)
+    assert np.allclose(w, weights, rtol=1e-12)
+
+def test_chebyshev_floats():
+    alpha, beta = chebyshev([2.0, 0.0, 2/3, 0.0])
+    assert np.allclose(alpha, [0, 0]) and np.allclose(beta, [2, 1/3])
+
+def test_inaccurate_moments():
+    unit = weight_fn(lambda k: 1/(k + 1))
+    unit.gauss(10)
+    with pytest.raises(ValueError, match='not positive'):
+        unit.gauss(15)
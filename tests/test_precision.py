@@ -0,0 +1,65 @@
+import inspect
+import numpy as np
+import pytest
+from mpmath import mp
+from cubit import golub_welsch, interval, precision, ray, square, tensor
+
+longdouble = pytest.mark.skipif(not precision.extended(np.longdouble),
+                                reason='longdouble is no more precise than float64')
+
+def reference(rule, dtype):
+    return tuple(np.array([dtype(mp.nstr(v, 30)) for v in part]) for part in rule)
+
+@longdouble
+def test_longdouble_gauss_legendre(monkeypatch):
+    monkeypatch.setattr(golub_welsch, 'cache_dir', None)
+    n = 20
+    with mp.workdps(40):
+        x, w = reference(golub_welsch.gauss_legendre(n), np.longdouble)
+    nodes, weights = interval.gauss_legendre(n, dtype=np.longdouble)
+    assert nodes.dtype == weights.dtype == np.longdouble
+    eps = np.finfo(np.longdouble).eps
+    assert np.max(np.abs(nodes - x)) < 8*eps
+    assert np.max(np.abs(weights - w)/w) < 32*eps
+    # Double-precision rules are not this accurate.
+    nodes, weights = interval.gauss_legendre(n)
+    assert np.max(np.abs(weights - w)/w) > 32*eps
+
+@longdouble
+def test_longdouble_gauss_laguerre(monkeypatch):
+    monkeypatch.setattr(golub_welsch, 'cache_dir', None)
+    n = 12
+    with mp.workdps(40):
+        x, w = reference(golub_welsch.gauss_genlaguerre(n, 0.5), np.longdouble)
+    nodes, weights = ray.gauss_genlaguerre(n, 0.5, dtype=np.longdouble)
+    eps = np.finfo(np.longdouble).eps
+    assert np.max(np.abs(nodes - x)/x) < 32*eps
+    assert np.max(np.abs(weights - w)/w) < 256*eps
+
+@longdouble
+def test_longdouble_gamma():
+    x = np.longdouble(3.5)
+    with mp.workdps(40):
+        exact = np.longdouble(mp.nstr(mp.gamma(mp.mpf(7)/2), 30))
+    assert abs(precision.gamma(x, np.longdouble) - exact) <= 2*np.finfo(np.longdouble).eps*exact
+
+def test_float32():
+    x, w = interval.gauss_legendre(10, dtype=np.float32)
+    X, W = interval.gauss_legendre(10)
+    assert x.dtype == w.dtype == np.float32
+    assert np.array_equal(x, X.astype(np.float32))
+    assert np.array_equal(w, W.astype(np.float32))
+
+def test_cast_tensor_rule():
+    rule = precision.cast(tensor.prod_gauss(3, 4), np.float32)
+    assert isinstance(rule, tensor.TensorRule)
+    assert all(x.dtype == w.dtype == np.float32 for x, w in rule.factors)
+    nodes, weights = rule.materialize()
+    assert weights.dtype == np.float32
+    assert np.isclose(np.sum(weights), 4, rtol=1e-6)
+
+def test_with_dtype_signature():
+    signature = inspect.signature(square.radon_7pt)
+    assert signature.parameters['dtype'].kind == inspect.Parameter.KEYWORD_ONLY
+    x, w = square.radon_7pt(dtype=np.float32)
+    assert w.dtype == np.float32
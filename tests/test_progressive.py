@@ -0,0 +1,30 @@
+import numpy as np
+from cubit import progressive, sparse
+
+def counted(f):
+    def wrapper(x):
+        wrapper.calls += len(x)
+        return f(x)
+    wrapper.calls = 0
+    return wrapper
+
+def test_reuses_earlier_levels():
+    f = counted(np.exp)
+    p = progressive.Progressive(f)
+    for level in range(1, 7):
+        value = p.refine()
+        nodes, weights = sparse.clenshaw_curtis_level(level)
+        assert p.neval == f.calls == len(nodes)
+        assert np.isclose(value, np.sum(weights*np.exp(nodes)), rtol=1e-14)
+
+def test_integrate_converges():
+    value, error, neval = progressive.integrate(np.exp, lower=0, upper=1)
+    assert isinstance(value, float)
+    assert abs(value - (np.e - 1)) < 1e-10 and error < 1e-10
+    assert neval <= 2**8 + 1
+
+def test_integrate_stops_at_max_level():
+    f = counted(lambda x: np.sqrt(np.abs(x)))
+    value, error, neval = progressive.integrate(f, atol=0, rtol=0, max_level=6)
+    assert neval == f.calls == 2**5 + 1
+    assert error > 0
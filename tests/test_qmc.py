@@ -0,0 +1,36 @@
+import numpy as np
+from cubit import qmc
+
+f = lambda x, y, z: np.exp(x + y*z)
+
+def exact():
+    # ∫∫∫ exp(x + y z) over [0, 1]**3, with the inner integrals done in
+    # closed form and the last by a fine midpoint rule
+    y = (np.arange(200000) + 0.5)/200000
+    return (np.e - 1)*np.mean(np.expm1(y)/y)
+
+def test_estimate_within_standard_errors():
+    truth = exact()
+    for seed in range(5):
+        rule = qmc.cube(2**10, 3, 0, 1, seed=seed, lazy=True)
+        value, error, neval = qmc.estimate(f, rule, replicates=16)
+        assert neval == 16*2**10
+        assert 0 < error < 1e-3
+        assert abs(value - truth) < 4*error
+
+def test_replicates_are_independent_and_reproducible():
+    rule = qmc.cube(2**8, 3, 0, 1, seed=7, lazy=True)
+    first = [r.integrate(f) for r in rule.replicates(4)]
+    again = [r.integrate(f) for r in qmc.cube(2**8, 3, 0, 1, seed=7, lazy=True).replicates(4)]
+    assert first == again
+    assert len(set(first)) == 4
+    other = [r.integrate(f) for r in qmc.cube(2**8, 3, 0, 1, seed=8, lazy=True).replicates(4)]
+    assert set(first).isdisjoint(other)
+
+def test_blocks_match_materialize():
+    rule = qmc.disk(2**10, seed=3, lazy=True)
+    nodes, weights = rule.materialize()
+    assert np.isclose(np.sum(weights), np.pi)
+    assert np.all(nodes[0]**2 + nodes[1]**2 <= 1 + 1e-12)
+    assert np.isclose(rule.integrate(lambda x, y: x**2, size=2**7),
+                      np.sum(weights*nodes[0]**2), rtol=1e-13)
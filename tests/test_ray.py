@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+from scipy import special
+from cubit import interval, ray
+
+threshold = interval.asymptotic_threshold
+
+@pytest.mark.parametrize('n', [threshold, threshold + 1])
+@pytest.mark.parametrize('alpha', [0, -0.5, 3])
+def test_laguerre_asy_matches_golub_welsch(n, alpha):
+    nodes, weights = ray.gauss_laguerre_asy(n, alpha)
+    x, w = special.roots_genlaguerre(n, alpha)
+    assert np.allclose(nodes, x, rtol=1e-13, atol=0)
+    # Most weights are far below the largest; compare those that matter.
+    large = w > 1e-200
+    assert np.allclose(weights[large], w[large], rtol=1e-10, atol=0)
+
+@pytest.mark.parametrize('alpha', [0, -0.5, 3])
+def test_laguerre_asy_exactness(alpha):
+    n = 1000
+    x, w = ray.gauss_genlaguerre(n, alpha)
+    assert np.all(np.diff(x) > 0)
+    for k in [0, 1, 5, 20, 50]:
+        exact = special.gamma(alpha + k + 1)
+        assert np.isclose(np.sum(w*x**k), exact, rtol=1e-11)
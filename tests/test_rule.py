@@ -0,0 +1,16 @@
+import numpy as np
+from cubit import interval, square
+from cubit.rule import Rule
+
+def test_longdouble_round_trip():
+    nodes, weights = interval.gauss_legendre(8, dtype=np.longdouble)
+    rule = Rule.from_tuple((nodes, weights), 15, 'interval')
+    assert rule.nodes.dtype == rule.weights.dtype == np.longdouble
+    x, w = rule
+    assert np.all(x == nodes) and np.all(w == weights)
+    assert rule.inside and rule.positive
+
+def test_float32_and_integer_inputs():
+    rule = Rule.from_tuple(square.prod_gauss(2, 2, dtype=np.float32))
+    assert rule.nodes.dtype == np.float32
+    assert Rule([0, 1], [1, 1]).weights.dtype == np.float64
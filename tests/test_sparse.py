@@ -0,0 +1,22 @@
+from itertools import product
+import numpy as np
+import pytest
+from cubit import sparse
+
+def monomial_integral(powers):
+    return np.prod([2/(k + 1) if k % 2 == 0 else 0 for k in powers])
+
+@pytest.mark.parametrize('d', [2, 3])
+@pytest.mark.parametrize('level', [1, 2, 3, 4])
+def test_smolyak_exactness(level, d):
+    nodes, weights = sparse.smolyak(level, d)
+    degree = 2*level - 1
+    for powers in product(range(degree + 1), repeat=d):
+        if sum(powers) <= degree:
+            value = np.sum(weights*np.prod([x**k for x, k in zip(nodes, powers)], axis=0))
+            assert np.isclose(value, monomial_integral(powers), rtol=1e-12, atol=1e-14)
+
+def test_smolyak_box():
+    nodes, weights = sparse.smolyak(3, 2, lower=0, upper=[1, 2])
+    assert np.isclose(np.sum(weights), 2)
+    assert np.isclose(np.sum(weights*nodes[0]**2*nodes[1]**3), 4/3)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from cubit import square, symmetry
+from cubit.integrate import unpack
+
+def sorted_rule(rule):
+    coords, weights = unpack(rule)
+    nodes = np.stack(coords, axis=-1)
+    order = np.lexsort(np.round(nodes, 12).T[::-1])
+    return nodes[order], weights[order]
+
+@pytest.mark.parametrize('rule', [square.prod_gauss(4, 4), square.prod_gauss(5, 5),
+                                  square.rr_25pt()])
+def test_orbits_expand_round_trip(rule):
+    representatives, weights, counts = symmetry.orbits(rule, 'square')
+    assert np.sum(counts) == len(unpack(rule)[1])
+    nodes, weights = sorted_rule(symmetry.expand(representatives, weights, 'square'))
+    expected_nodes, expected_weights = sorted_rule(rule)
+    assert np.allclose(nodes, expected_nodes, rtol=0, atol=1e-14)
+    assert np.allclose(weights, expected_weights, rtol=1e-14, atol=0)
+
+def test_integrate_invariant_function():
+    rule = square.prod_gauss(5, 5)
+    f = lambda x, y: np.cos(x)*np.cos(y) + x**2*y**2
+    coords, weights = unpack(rule)
+    expected = np.sum(weights*f(*coords))
+    assert np.isclose(symmetry.integrate(f, symmetry.orbits(rule, 'square')), expected,
+                      rtol=1e-14)
+
+def test_non_symmetric_rule():
+    with pytest.raises(ValueError):
+        symmetry.orbits(square.prod_gauss(2, 3), 'square')
+    x, w = square.prod_gauss(3, 3)
+    w = w.copy()
+    w[0] *= 1.01
+    with pytest.raises(ValueError):
+        symmetry.orbits((x, w), 'square')